@@ -0,0 +1,309 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from benchmarks.synthetic import DEPTH_STEP, depth_range, generate_csv
+
+logger = logging.getLogger("benchmarks")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark ingest, colormap and /frames hot paths")
+    parser.add_argument("--rows", type=int, default=100000, help="Rows in the synthetic CSV")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--invalid-fraction", type=float, default=0.001, help="Share of rows dropped on ingest")
+    parser.add_argument("--target-width", type=int, default=150)
+    parser.add_argument("--database-url", default=None, help="Defaults to a SQLite file in --workdir")
+    parser.add_argument("--workdir", default=".bench", help="Directory for generated sources and the SQLite file")
+    parser.add_argument("--formats", default="csv", help="Comma-separated source formats to ingest: csv, raw")
+    parser.add_argument("--workers", type=int, default=1, help="Processes parsing CSV sources")
+    parser.add_argument("--repeat", type=int, default=1, help="Ingest runs per format")
+    parser.add_argument("--colormap", default="viridis")
+    parser.add_argument("--colormap-batch-size", type=int, default=1000)
+    parser.add_argument("--page-sizes", default="10,100,1000,10000")
+    parser.add_argument("--frame-formats", default="json,npy")
+    parser.add_argument("--iterations", type=int, default=50, help="Requests per /frames scenario")
+    parser.add_argument("--skip", default="", help="Comma-separated stages to skip: ingest, colormap, frames")
+    parser.add_argument("--keep", action="store_true", help="Keep the benchmark image instead of deleting it")
+    parser.add_argument("--output", default=None, help="Write the JSON results here instead of stdout")
+    parser.add_argument("--verbose", action="store_true")
+    return parser.parse_args(argv)
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """
+    Point the app's settings at the benchmark database and data directory.
+
+    Must run before anything under `src` is imported, because settings are read at import time.
+    """
+    workdir = os.path.abspath(args.workdir)
+    os.makedirs(workdir, exist_ok=True)
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.sqlite')}"
+    os.environ["INGEST_DATA_DIR"] = workdir
+    for name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+        os.environ.setdefault(name, "bench")
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+        "mean_ms": float(values.mean()),
+        "max_ms": float(values.max()),
+    }
+
+
+def prepare_sources(args: argparse.Namespace, formats: List[str]) -> Dict[str, str]:
+    from src.config import settings
+    from src.services import RawSource, open_source
+
+    name = f"synthetic_{args.rows}_{args.seed}.csv"
+    started = time.perf_counter()
+    generate_csv(os.path.join(args.workdir, name), args.rows, args.seed, args.invalid_fraction)
+    logger.info(f"Source {name} ready in {time.perf_counter() - started:.1f}s")
+
+    sources = {"csv": name}
+    if "raw" in formats:
+        raw_name = name.replace(".csv", ".bin")
+        raw_path = os.path.join(args.workdir, raw_name)
+        if not os.path.exists(raw_path):
+            RawSource.write(raw_path, open_source(name), settings.ingest_chunk_rows)
+        sources["raw"] = raw_name
+    return {source_format: sources[source_format] for source_format in formats}
+
+
+def delete_image(image_id: int) -> None:
+    from src.database import BulkSessionLocal
+    from src.repositories import ImageFrameRepository, ImageRepository
+
+    db = BulkSessionLocal()
+    try:
+        ImageFrameRepository(db).delete_by_image(image_id)
+        ImageRepository(db).delete(image_id)
+    finally:
+        db.close()
+
+
+def bench_ingest(args: argparse.Namespace, source_format: str, source_name: str) -> Dict:
+    from src.database import BulkSessionLocal
+    from src.repositories import ImageFrameLevelRepository, ImageFrameRepository, ImageRepository
+    from src.services import DataLoader, Job, open_source
+
+    job = Job(id=f"bench-ingest-{source_format}", kind="resize", params={})
+    db = BulkSessionLocal()
+    try:
+        loader = DataLoader(ImageFrameRepository(db), ImageRepository(db), ImageFrameLevelRepository(db))
+        started = time.perf_counter()
+        image_id, frames = loader.load_resize_and_save(
+            open_source(source_name),
+            args.target_width,
+            job=job,
+            workers=args.workers
+        )
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    rows = job.frames_processed + job.rows_dropped
+    return {
+        "format": source_format,
+        "image_id": image_id,
+        "ingest_mode": job.ingest_mode,
+        "rows": rows,
+        "frames": frames,
+        "rows_dropped": job.rows_dropped,
+        "seconds": elapsed,
+        "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+        "source_bytes": os.path.getsize(os.path.join(args.workdir, source_name)),
+        "workers": {
+            worker: {"rows": stats.rows, "seconds": stats.seconds, "rows_per_second": stats.throughput}
+            for worker, stats in job.worker_stats.items()
+        },
+    }
+
+
+def bench_colormap(args: argparse.Namespace, image_id: int) -> Dict:
+    from src.database import BulkSessionLocal
+    from src.repositories import ColormapJobRepository, ImageFrameRepository, ImageRepository
+    from src.services import ColorMapProcessor
+    from src.utils import ColormapHandler
+
+    db = BulkSessionLocal()
+    try:
+        frame_repository = ImageFrameRepository(db)
+        job_repository = ColormapJobRepository(db)
+        processor = ColorMapProcessor(frame_repository, ImageRepository(db), job_repository)
+
+        # Compute alone, on the matrix the pipeline would read, to separate it from database time.
+        matrix = frame_repository.get_depth_matrix(image_id)[1]
+        started = time.perf_counter()
+        ColormapHandler.apply_colormap_batch(matrix, args.colormap)
+        compute_seconds = time.perf_counter() - started
+
+        total = frame_repository.count_frames_needing_colormap(image_id, args.colormap)
+        colormap_job = job_repository.create_job(image_id, args.colormap, args.colormap_batch_size, total)
+        started = time.perf_counter()
+        result = processor.apply_colormap_to_image(colormap_job.id)
+        elapsed = time.perf_counter() - started
+    finally:
+        db.close()
+
+    processed = result.get("processed", 0)
+    return {
+        "colormap": args.colormap,
+        "batch_size": args.colormap_batch_size,
+        "frames": processed,
+        "seconds": elapsed,
+        "frames_per_second": processed / elapsed if elapsed > 0 else 0.0,
+        "compute_frames_per_second": len(matrix) / compute_seconds if compute_seconds > 0 else 0.0,
+    }
+
+
+def bench_frames(args: argparse.Namespace, image_id: int) -> List[Dict]:
+    from fastapi.testclient import TestClient
+    from src.config import settings
+    from src.main import app
+
+    rng = np.random.default_rng(args.seed)
+    depth_min, depth_max = depth_range(args.rows)
+    page_sizes = [int(size) for size in args.page_sizes.split(",") if size]
+    results = []
+
+    with TestClient(app) as client:
+        for frame_format in [name for name in args.frame_formats.split(",") if name]:
+            for per_page in page_sizes:
+                if frame_format == "json" and per_page > settings.frames_max_json_rows:
+                    continue
+                if per_page > settings.frames_max_binary_rows:
+                    continue
+
+                # "random" starts each page at a new depth, so most reads miss the block cache;
+                # "repeat" asks for the same page every time and measures the cached path.
+                for access in ("random", "repeat"):
+                    last_full_page = max(depth_min, depth_max - per_page * DEPTH_STEP)
+                    starts = rng.uniform(depth_min, last_full_page, args.iterations)
+                    if access == "repeat":
+                        starts[:] = starts[0]
+
+                    latencies, sizes = [], []
+                    for start in starts:
+                        params = {"image_id": image_id, "per_page": per_page, "depth_min": float(start)}
+                        if frame_format != "json":
+                            params["format"] = frame_format
+                        began = time.perf_counter()
+                        response = client.get("/api/v1/frames", params=params)
+                        latencies.append(time.perf_counter() - began)
+                        if response.status_code != 200:
+                            raise RuntimeError(f"/frames returned {response.status_code}: {response.text[:200]}")
+                        sizes.append(len(response.content))
+
+                    results.append({
+                        "format": frame_format,
+                        "per_page": per_page,
+                        "access": access,
+                        "requests": len(latencies),
+                        **percentiles(latencies),
+                        "mean_bytes": float(np.mean(sizes)),
+                    })
+                    logger.info(
+                        f"/frames {frame_format} per_page={per_page} {access}: "
+                        f"p50 {results[-1]['p50_ms']:.1f}ms p99 {results[-1]['p99_ms']:.1f}ms"
+                    )
+
+    return results
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args: argparse.Namespace) -> Dict:
+    configure_environment(args)
+    from src.database import Base, engine
+
+    # The app configures INFO logging on import; batch logs would swamp the timings otherwise.
+    import src.main  # noqa: F401
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    logger.setLevel(logging.INFO)
+
+    Base.metadata.create_all(bind=engine)
+    skip = {stage for stage in args.skip.split(",") if stage}
+    formats = [name for name in args.formats.split(",") if name]
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": engine.dialect.name,
+            "args": {key: value for key, value in vars(args).items() if key != "database_url"},
+        }
+    }
+
+    sources = prepare_sources(args, formats)
+    image_id = None
+    try:
+        if "ingest" not in skip:
+            results["ingest"] = []
+            for source_format, source_name in sources.items():
+                for _ in range(args.repeat):
+                    # Each run starts from an empty image, otherwise the source fingerprint would reuse it.
+                    if image_id is not None:
+                        delete_image(image_id)
+                    result = bench_ingest(args, source_format, source_name)
+                    image_id = result["image_id"]
+                    results["ingest"].append(result)
+                    logger.info(f"Ingest {source_format}: {result['rows_per_second']:.0f} rows/s")
+        else:
+            from src.database import SessionLocal
+            from src.models import Image
+            db = SessionLocal()
+            try:
+                image = db.query(Image).order_by(Image.id.desc()).first()
+            finally:
+                db.close()
+            if image is None:
+                raise RuntimeError("No image to benchmark; run without --skip ingest first")
+            image_id = image.id
+
+        if "colormap" not in skip:
+            results["colormap"] = bench_colormap(args, image_id)
+            logger.info(f"Colormap: {results['colormap']['frames_per_second']:.0f} frames/s")
+
+        if "frames" not in skip:
+            results["frames"] = bench_frames(args, image_id)
+    finally:
+        if image_id is not None and not args.keep and "ingest" not in skip:
+            delete_image(image_id)
+
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stderr)
+    args = parse_args(argv)
+    results = run(args)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        logger.info(f"Results written to {args.output}")
+    else:
+        print(output)
@@ -0,0 +1,47 @@
+import os
+import numpy as np
+import pandas as pd
+
+SOURCE_WIDTH = 200
+DEPTH_START = 9000.0
+DEPTH_STEP = 0.1
+CHUNK_ROWS = 50000
+
+
+def depth_range(rows: int) -> tuple:
+    return DEPTH_START, round(DEPTH_START + (rows - 1) * DEPTH_STEP, 1)
+
+
+def generate_csv(path: str, rows: int, seed: int = 0, invalid_fraction: float = 0.0) -> str:
+    """
+    Write a CSV shaped like data.csv: a `depth` column then col1..col200 of grayscale pixels.
+
+    Pixels are smooth random walks along each row, so they compress and resize like real
+    scans rather than like noise. `invalid_fraction` of the rows get a blank pixel and are
+    dropped on ingest. The same (rows, seed, invalid_fraction) always produces the same file.
+    """
+    if os.path.exists(path):
+        return path
+
+    rng = np.random.default_rng(seed)
+    columns = ["depth"] + [f"col{i}" for i in range(1, SOURCE_WIDTH + 1)]
+    tmp_path = f"{path}.tmp"
+
+    with open(tmp_path, "w", newline="") as f:
+        for start in range(0, rows, CHUNK_ROWS):
+            count = min(CHUNK_ROWS, rows - start)
+            steps = rng.integers(-6, 7, size=(count, SOURCE_WIDTH))
+            pixels = np.clip(rng.integers(40, 216, size=(count, 1)) + np.cumsum(steps, axis=1), 0, 255)
+
+            frame = pd.DataFrame(pixels.astype(np.int64), columns=columns[1:])
+            frame.insert(0, "depth", np.round(DEPTH_START + np.arange(start, start + count) * DEPTH_STEP, 1))
+            if invalid_fraction:
+                invalid = rng.random(count) < invalid_fraction
+                column = columns[1 + SOURCE_WIDTH // 2]
+                frame[column] = frame[column].astype(object)
+                frame.loc[invalid, column] = ""
+
+            frame.to_csv(f, header=start == 0, index=False)
+
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+import sys
+import time
+from src.config import settings
+from src.services.frame_sources import RawSource, open_source
+
+
+def convert(source_path: str, target_path: str):
+    source = open_source(source_path)
+    print(f"Converting {source.path} to {target_path}...")
+
+    start = time.perf_counter()
+    written, dropped = RawSource.write(target_path, source, settings.ingest_chunk_rows)
+    print(f"Wrote {written} frames ({dropped} invalid rows dropped) in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python convert_source.py <source> <target.bin>")
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
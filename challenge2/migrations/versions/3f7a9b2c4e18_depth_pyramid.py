@@ -0,0 +1,32 @@
+"""depth pyramid"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '3f7a9b2c4e18'
+down_revision = '8c4d2f6e1a73'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('pyramid_levels', sa.Integer(), nullable=False, server_default='0'))
+    op.create_table(
+        'image_frame_levels',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('image_id', sa.Integer(), nullable=False),
+        sa.Column('level', sa.Integer(), nullable=False),
+        sa.Column('depth', sa.Float(), nullable=False),
+        sa.Column('width', sa.Integer(), nullable=False),
+        sa.Column('pixels', sa.LargeBinary(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['image_id'], ['images.id'], ondelete='CASCADE')
+    )
+    op.create_index('idx_level_image_depth', 'image_frame_levels', ['image_id', 'level', 'depth'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_level_image_depth', table_name='image_frame_levels')
+    op.drop_table('image_frame_levels')
+    op.drop_column('images', 'pyramid_levels')
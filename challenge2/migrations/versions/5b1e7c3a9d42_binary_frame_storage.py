@@ -0,0 +1,68 @@
+"""binary frame storage"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5b1e7c3a9d42'
+down_revision = '12229898f655'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('image_frames', sa.Column('width', sa.Integer(), nullable=True))
+    op.add_column('image_frames', sa.Column('pixels_packed', sa.LargeBinary(), nullable=True))
+    op.add_column('image_frames', sa.Column('color_map_packed', sa.LargeBinary(), nullable=True))
+
+    # Pack each JSON array into one byte per channel value, preserving element order.
+    op.execute("""
+        UPDATE image_frames SET
+            width = json_array_length(pixels),
+            pixels_packed = COALESCE(
+                (SELECT decode(string_agg(lpad(to_hex(p.value::int), 2, '0'), '' ORDER BY p.ord), 'hex')
+                 FROM json_array_elements_text(pixels) WITH ORDINALITY AS p(value, ord)),
+                ''::bytea
+            ),
+            color_map_packed = CASE WHEN color_map_pixels IS NULL THEN NULL ELSE COALESCE(
+                (SELECT decode(string_agg(lpad(to_hex(c.value::int), 2, '0'), '' ORDER BY px.ord, c.ord), 'hex')
+                 FROM json_array_elements(color_map_pixels) WITH ORDINALITY AS px(rgb, ord),
+                      json_array_elements_text(px.rgb) WITH ORDINALITY AS c(value, ord)),
+                ''::bytea
+            ) END
+    """)
+
+    op.drop_column('image_frames', 'pixels')
+    op.drop_column('image_frames', 'color_map_pixels')
+    op.alter_column('image_frames', 'pixels_packed', new_column_name='pixels', nullable=False)
+    op.alter_column('image_frames', 'color_map_packed', new_column_name='color_map_pixels')
+    op.alter_column('image_frames', 'width', nullable=False)
+
+
+def downgrade() -> None:
+    op.add_column('image_frames', sa.Column('pixels_json', sa.JSON(), nullable=True))
+    op.add_column('image_frames', sa.Column('color_map_json', sa.JSON(), nullable=True))
+
+    op.execute("""
+        UPDATE image_frames SET
+            pixels_json = COALESCE(
+                (SELECT json_agg(get_byte(pixels, i) ORDER BY i)
+                 FROM generate_series(0, length(pixels) - 1) AS i),
+                '[]'::json
+            ),
+            color_map_json = CASE WHEN color_map_pixels IS NULL THEN NULL ELSE COALESCE(
+                (SELECT json_agg(
+                    json_build_array(
+                        get_byte(color_map_pixels, i * 3),
+                        get_byte(color_map_pixels, i * 3 + 1),
+                        get_byte(color_map_pixels, i * 3 + 2)
+                    ) ORDER BY i)
+                 FROM generate_series(0, length(color_map_pixels) / 3 - 1) AS i),
+                '[]'::json
+            ) END
+    """)
+
+    op.drop_column('image_frames', 'pixels')
+    op.drop_column('image_frames', 'color_map_pixels')
+    op.drop_column('image_frames', 'width')
+    op.alter_column('image_frames', 'pixels_json', new_column_name='pixels', nullable=False)
+    op.alter_column('image_frames', 'color_map_json', new_column_name='color_map_pixels')
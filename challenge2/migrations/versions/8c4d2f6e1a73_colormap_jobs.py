@@ -0,0 +1,35 @@
+"""colormap jobs"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '8c4d2f6e1a73'
+down_revision = '5b1e7c3a9d42'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'colormap_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('image_id', sa.Integer(), nullable=False),
+        sa.Column('colormap_name', sa.String(length=50), nullable=False),
+        sa.Column('batch_size', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False, server_default='pending'),
+        sa.Column('last_frame_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('total', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.ForeignKeyConstraint(['image_id'], ['images.id'], ondelete='CASCADE')
+    )
+    op.create_index('idx_colormap_job_image_status', 'colormap_jobs', ['image_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_colormap_job_image_status', table_name='colormap_jobs')
+    op.drop_table('colormap_jobs')
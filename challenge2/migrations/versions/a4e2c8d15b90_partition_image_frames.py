@@ -0,0 +1,82 @@
+"""partition image_frames by image_id"""
+from alembic import op
+
+
+revision = 'a4e2c8d15b90'
+down_revision = '3f7a9b2c4e18'
+branch_labels = None
+depends_on = None
+
+COLUMNS = "id, image_id, depth, width, pixels, color_map_pixels, colormap_name, created_at, colormap_applied_at"
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE image_frames RENAME TO image_frames_unpartitioned")
+    op.execute(
+        "ALTER TABLE image_frames_unpartitioned RENAME CONSTRAINT image_frames_pkey TO image_frames_unpartitioned_pkey"
+    )
+    op.execute("ALTER INDEX idx_image_depth RENAME TO idx_image_depth_unpartitioned")
+    op.execute("ALTER INDEX idx_colormap_status RENAME TO idx_colormap_status_unpartitioned")
+
+    # The partition key has to be part of the primary key.
+    op.execute("""
+        CREATE TABLE image_frames (
+            id integer NOT NULL DEFAULT nextval('image_frames_id_seq'),
+            image_id integer NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+            depth double precision NOT NULL,
+            width integer NOT NULL,
+            pixels bytea NOT NULL,
+            color_map_pixels bytea,
+            colormap_name varchar(50),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            colormap_applied_at timestamptz,
+            PRIMARY KEY (image_id, id)
+        ) PARTITION BY LIST (image_id)
+    """)
+    op.execute("ALTER SEQUENCE image_frames_id_seq OWNED BY image_frames.id")
+    op.execute("CREATE UNIQUE INDEX idx_image_depth ON image_frames (image_id, depth)")
+    op.execute("CREATE INDEX idx_colormap_status ON image_frames (image_id, colormap_name)")
+    # Catches frames of images ingested by code that predates staging partitions.
+    op.execute("CREATE TABLE image_frames_default PARTITION OF image_frames DEFAULT")
+
+    op.execute("""
+        DO $$
+        DECLARE
+            frame_image_id integer;
+        BEGIN
+            FOR frame_image_id IN SELECT DISTINCT image_id FROM image_frames_unpartitioned LOOP
+                EXECUTE 'CREATE TABLE image_frames_p' || frame_image_id
+                    || ' PARTITION OF image_frames FOR VALUES IN (' || frame_image_id || ')';
+            END LOOP;
+        END $$
+    """)
+    op.execute(f"INSERT INTO image_frames ({COLUMNS}) SELECT {COLUMNS} FROM image_frames_unpartitioned")
+    op.execute("DROP TABLE image_frames_unpartitioned")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE image_frames RENAME TO image_frames_partitioned")
+    op.execute(
+        "ALTER TABLE image_frames_partitioned RENAME CONSTRAINT image_frames_pkey TO image_frames_partitioned_pkey"
+    )
+    op.execute("ALTER INDEX idx_image_depth RENAME TO idx_image_depth_partitioned")
+    op.execute("ALTER INDEX idx_colormap_status RENAME TO idx_colormap_status_partitioned")
+
+    op.execute("""
+        CREATE TABLE image_frames (
+            id integer NOT NULL DEFAULT nextval('image_frames_id_seq') PRIMARY KEY,
+            image_id integer NOT NULL REFERENCES images(id) ON DELETE CASCADE,
+            depth double precision NOT NULL,
+            width integer NOT NULL,
+            pixels bytea NOT NULL,
+            color_map_pixels bytea,
+            colormap_name varchar(50),
+            created_at timestamptz NOT NULL DEFAULT now(),
+            colormap_applied_at timestamptz
+        )
+    """)
+    op.execute("ALTER SEQUENCE image_frames_id_seq OWNED BY image_frames.id")
+    op.execute(f"INSERT INTO image_frames ({COLUMNS}) SELECT {COLUMNS} FROM image_frames_partitioned")
+    op.execute("DROP TABLE image_frames_partitioned")
+    op.execute("CREATE UNIQUE INDEX idx_image_depth ON image_frames (image_id, depth)")
+    op.execute("CREATE INDEX idx_colormap_status ON image_frames (image_id, colormap_name)")
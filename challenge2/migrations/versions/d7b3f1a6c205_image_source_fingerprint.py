@@ -0,0 +1,23 @@
+"""image source fingerprint"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd7b3f1a6c205'
+down_revision = 'a4e2c8d15b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('source_hash', sa.String(length=64), nullable=True))
+    op.add_column('images', sa.Column('source_size', sa.BigInteger(), nullable=True))
+    op.add_column('images', sa.Column('source_mtime', sa.Float(), nullable=True))
+    op.create_index('idx_image_source_hash', 'images', ['source_hash', 'target_width'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_image_source_hash', table_name='images')
+    op.drop_column('images', 'source_mtime')
+    op.drop_column('images', 'source_size')
+    op.drop_column('images', 'source_hash')
@@ -0,0 +1,23 @@
+"""derived images"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e91c4a7d3b62'
+down_revision = 'd7b3f1a6c205'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('images', sa.Column('derived_from_id', sa.Integer(), nullable=True))
+    op.create_foreign_key(
+        'fk_images_derived_from_id', 'images', 'images', ['derived_from_id'], ['id'], ondelete='SET NULL'
+    )
+    op.create_index('idx_image_derived_from', 'images', ['derived_from_id', 'target_width'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_image_derived_from', table_name='images')
+    op.drop_constraint('fk_images_derived_from_id', 'images', type_='foreignkey')
+    op.drop_column('images', 'derived_from_id')
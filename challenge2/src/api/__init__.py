@@ -1,3 +1,4 @@
 from .routes import router
+from .admin import admin_router
 
-__all__ = ["router"]
\ No newline at end of file
+__all__ = ["router", "admin_router"]
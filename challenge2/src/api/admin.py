@@ -0,0 +1,70 @@
+from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Response
+from src.profiling import Profile, ProfileFormat, profiler
+from . import schemas
+
+admin_router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
+
+MEDIA_TYPES = {
+    ProfileFormat.collapsed: "text/plain; charset=utf-8",
+    ProfileFormat.text: "text/plain; charset=utf-8",
+    ProfileFormat.pstats: "application/octet-stream",
+}
+
+
+def to_profile_response(profile: Profile) -> schemas.ProfileResponse:
+    return schemas.ProfileResponse(
+        id=profile.id,
+        kind=profile.kind,
+        name=profile.name,
+        mode=profile.mode.value,
+        trigger=profile.trigger.value,
+        duration_ms=profile.duration_ms,
+        samples=profile.samples,
+        formats=[profile_format.value for profile_format in profile.formats],
+        created_at=profile.created_at
+    )
+
+
+@admin_router.get("/profiles", response_model=List[schemas.ProfileResponse])
+async def list_profiles():
+    return [to_profile_response(profile) for profile in profiler.recent()]
+
+
+@admin_router.get(
+    "/profiles/{profile_id}",
+    response_class=Response,
+    responses={200: {"content": {"text/plain": {}, "application/octet-stream": {}}}}
+)
+async def get_profile(
+    profile_id: str,
+    format: Optional[ProfileFormat] = Query(
+        None, description="collapsed (sampled profiles), text or pstats (cProfile); defaults to the first available"
+    )
+):
+    profile = profiler.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail=f"Profile {profile_id} not found")
+
+    profile_format = format or profile.formats[0]
+    if profile_format not in profile.formats:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A {profile.mode.value} profile is available as {', '.join(f.value for f in profile.formats)}"
+        )
+
+    if profile_format == ProfileFormat.collapsed:
+        content = profile.collapsed
+    elif profile_format == ProfileFormat.text:
+        content = profile.text()
+    else:
+        content = profile.pstats_bytes()
+
+    headers = {"Content-Disposition": f'attachment; filename="{profile.id}.{profile_format.value}"'}
+    return Response(content=content, headers={**headers, "Content-Type": MEDIA_TYPES[profile_format]})
+
+
+@admin_router.delete("/profiles", status_code=204)
+async def clear_profiles():
+    profiler.clear()
+    return Response(status_code=204)
@@ -0,0 +1,171 @@
+import io
+import json
+from enum import Enum
+from typing import AsyncIterable, AsyncIterator, Dict, Optional
+import numpy as np
+from fastapi import HTTPException, Response
+from fastapi.responses import StreamingResponse
+from src.cache import FrameBlock
+from src.models import ImageFrame
+from src.repositories import ImageFrameRepository
+from src.utils import ColormapHandler, FrameCursor
+
+
+class FrameFormat(str, Enum):
+    json = "json"
+    ndjson = "ndjson"
+    binary = "binary"
+    npy = "npy"
+
+
+MEDIA_TYPES: Dict[FrameFormat, str] = {
+    FrameFormat.json: "application/json",
+    FrameFormat.ndjson: "application/x-ndjson",
+    FrameFormat.binary: "application/octet-stream",
+    FrameFormat.npy: "application/x-npy",
+}
+
+
+def negotiate_frame_format(requested: Optional[FrameFormat], accept: Optional[str]) -> FrameFormat:
+    """
+    Pick a response format from the `format` query parameter, falling back to the Accept header.
+    """
+    if requested is not None:
+        return requested
+
+    for media_range in (accept or "").split(","):
+        media_type = media_range.split(";")[0].strip().lower()
+        for frame_format, format_media_type in MEDIA_TYPES.items():
+            if media_type == format_media_type:
+                return frame_format
+
+    return FrameFormat.json
+
+
+def frame_matrix(frames: FrameBlock, colormap: Optional[str]) -> np.ndarray:
+    if colormap is not None:
+        return ColormapHandler.apply_colormap_batch(frames.matrix, colormap)
+    return frames.matrix
+
+
+def pagination_headers(
+    count: int,
+    total: Optional[int],
+    next_cursor: Optional[str],
+    level: int = 0
+) -> Dict[str, str]:
+    headers = {"X-Frame-Count": str(count), "X-Pyramid-Level": str(level)}
+    if total is not None:
+        headers["X-Total"] = str(total)
+    if next_cursor is not None:
+        headers["X-Next-Cursor"] = next_cursor
+    return headers
+
+
+def binary_response(frames: FrameBlock, matrix: np.ndarray, headers: Dict[str, str]) -> Response:
+    """
+    Little-endian float64 depth vector followed by the contiguous uint8 pixel matrix.
+
+    The matrix shape is described by the X-Frame-Count, X-Frame-Width and
+    X-Frame-Channels headers.
+    """
+    depths = frames.depths.astype("<f8", copy=False)
+    channels = matrix.shape[2] if matrix.ndim == 3 else 1
+    headers = {
+        **headers,
+        "X-Frame-Width": str(matrix.shape[1] if matrix.ndim > 1 else 0),
+        "X-Frame-Channels": str(channels),
+    }
+    body = depths.tobytes() + np.ascontiguousarray(matrix).tobytes()
+    return Response(content=body, media_type=MEDIA_TYPES[FrameFormat.binary], headers=headers)
+
+
+def npy_response(frames: FrameBlock, matrix: np.ndarray, headers: Dict[str, str]) -> Response:
+    """
+    A single .npy record array with `depth` and `pixels` fields, loadable with `np.load`.
+    """
+    records = np.empty(len(frames), dtype=[("depth", "<f8"), ("pixels", "u1", matrix.shape[1:])])
+    records["depth"] = frames.depths
+    records["pixels"] = matrix
+
+    buffer = io.BytesIO()
+    np.save(buffer, records, allow_pickle=False)
+    return Response(content=buffer.getvalue(), media_type=MEDIA_TYPES[FrameFormat.npy], headers=headers)
+
+
+def ndjson_response(
+    frames: AsyncIterable[ImageFrame],
+    per_page: int,
+    coloredmap: Optional[bool],
+    colormap: Optional[str],
+    level: int = 0
+) -> StreamingResponse:
+    return StreamingResponse(
+        ndjson_lines(frames, per_page, coloredmap, colormap),
+        media_type=MEDIA_TYPES[FrameFormat.ndjson],
+        headers={"X-Pyramid-Level": str(level)}
+    )
+
+
+async def ndjson_lines(
+    frames: AsyncIterable[ImageFrame],
+    per_page: int,
+    coloredmap: Optional[bool],
+    colormap: Optional[str]
+) -> AsyncIterator[bytes]:
+    """
+    Yield one JSON line per frame as rows arrive from the database cursor.
+
+    `frames` holds up to per_page + 1 rows; when the extra row shows up, a
+    final `{"next_cursor": ...}` line is emitted instead of it.
+    """
+    lut = ColormapHandler.get_lut(colormap) if colormap is not None else None
+    previous = None
+    count = 0
+
+    async for frame in frames:
+        if count == per_page:
+            yield json.dumps({"next_cursor": FrameCursor.encode(previous.depth, previous.id)}).encode() + b"\n"
+            return
+
+        yield json.dumps(frame_payload(frame, coloredmap, colormap, lut), separators=(",", ":")).encode() + b"\n"
+        previous = frame
+        count += 1
+
+
+def frame_payload(
+    frame: ImageFrame,
+    coloredmap: Optional[bool],
+    colormap: Optional[str],
+    lut: Optional[np.ndarray]
+) -> Dict:
+    payload = {
+        "id": frame.id,
+        "image_id": frame.image_id,
+        "depth": frame.depth,
+        "pixels": [],
+        "color_map_pixels": [],
+        "colormap_name": frame.colormap_name,
+        "created_at": frame.created_at.isoformat() if frame.created_at else None,
+        "colormap_applied_at": frame.colormap_applied_at.isoformat() if frame.colormap_applied_at else None,
+    }
+
+    if lut is not None:
+        payload["color_map_pixels"] = lut[ImageFrameRepository.pixels_array(frame)].tolist()
+        payload["colormap_name"] = colormap
+        payload["colormap_applied_at"] = None
+    elif coloredmap is True:
+        color_map = ImageFrameRepository.color_map_array(frame)
+        payload["color_map_pixels"] = color_map.tolist() if color_map is not None else []
+    else:
+        payload["pixels"] = ImageFrameRepository.pixels_array(frame).tolist()
+
+    return payload
+
+
+def check_page_size(frame_format: FrameFormat, per_page: int, max_json_rows: int) -> None:
+    if frame_format == FrameFormat.json and per_page > max_json_rows:
+        raise HTTPException(
+            status_code=400,
+            detail=f"per_page is limited to {max_json_rows} for JSON responses; use a binary or NDJSON format"
+        )
@@ -1,91 +1,211 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, Body
-from typing import Optional
-from src.services import DataLoader, ColorMapProcessor, FrameService
+from fastapi import APIRouter, Depends, HTTPException, Query, Body, Request, Response
+from typing import Dict, Optional
+from src.services import (
+    DataLoader, ColorMapProcessor, FrameService, ImageRenderer, RenderFormat, SourceFormat, open_source, Job, job_manager
+)
+from src.cache import frame_block_cache
+from src.repositories import ImageRepository
+from src.database import get_pool_stats
+from src.config import settings
 from . import schemas
+from .responses import (
+    FrameFormat, MEDIA_TYPES, negotiate_frame_format, check_page_size, frame_matrix,
+    pagination_headers, binary_response, npy_response, ndjson_response
+)
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1", tags=["images"])
 
 
-@router.post("/resize", response_model=schemas.ResizeResponse)
-async def resize_images(
-    request: schemas.ResizeRequest = Body(...),
-    data_loader: DataLoader = Depends()
-):
+def to_job_response(job: Job) -> schemas.JobResponse:
+    return schemas.JobResponse(
+        job_id=job.id,
+        kind=job.kind,
+        status=job.status,
+        image_id=job.image_id,
+        frames_processed=job.frames_processed,
+        rows_dropped=job.rows_dropped,
+        ingest_mode=job.ingest_mode,
+        throughput=job.throughput,
+        elapsed_seconds=job.elapsed_seconds,
+        error=job.error,
+        profile_id=job.profile_id,
+        workers={
+            worker: schemas.WorkerStatsResponse(rows=stats.rows, seconds=stats.seconds, throughput=stats.throughput)
+            for worker, stats in job.worker_stats.items()
+        },
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at
+    )
+
+
+@router.post("/resize", response_model=schemas.JobResponse, status_code=202)
+async def resize_images(request: schemas.ResizeRequest = Body(...)):
     try:
-        image_id, frames_processed = data_loader.load_resize_and_save(
-            csv_path="data.csv",
-            target_width=request.target_width
-        )
+        source = open_source(request.source, SourceFormat(request.format.value) if request.format else None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        return schemas.ResizeResponse(
-            message=f"Successfully processed and resized {frames_processed} frames",
-            image_id=image_id,
-            frames_processed=frames_processed,
-            target_width=request.target_width
-        )
-    except Exception as e:
-        logger.error(f"Error in resize endpoint: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+    job = job_manager.submit(
+        "resize",
+        DataLoader.run_job,
+        source=source,
+        target_width=request.target_width,
+        workers=min(request.workers, settings.ingest_max_processes),
+        ordered=request.ordered
+    )
+    return to_job_response(job)
+
+
+@router.post("/images/{image_id}/derive", response_model=schemas.JobResponse, status_code=202)
+def derive_image(
+    image_id: int,
+    request: schemas.DeriveRequest = Body(...),
+    image_repository: ImageRepository = Depends()
+):
+    # Checked on the primary: a replica may not have the image yet right after its ingest.
+    if not image_repository.get_by_id(image_id):
+        raise HTTPException(status_code=404, detail=f"Image {image_id} not found")
+    job = job_manager.submit(
+        "derive",
+        DataLoader.run_derive_job,
+        image_id=image_id,
+        target_width=request.target_width
+    )
+    return to_job_response(job)
 
 
-@router.get("/frames", response_model=schemas.FramesQueryResponse)
+@router.get("/jobs/{job_id}", response_model=schemas.JobResponse)
+async def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return to_job_response(job)
+
+
+@router.delete("/jobs/{job_id}", response_model=schemas.JobResponse)
+async def cancel_job(job_id: str):
+    job = job_manager.cancel(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return to_job_response(job)
+
+
+@router.get(
+    "/frames",
+    response_model=schemas.FramesQueryResponse,
+    responses={
+        200: {"content": {media_type: {} for media_type in MEDIA_TYPES.values()}}
+    }
+)
 async def get_frames(
+    request: Request,
     image_id: int = Query(..., description="Image ID"),
     depth_min: Optional[float] = Query(None, description="Minimum depth value"),
     depth_max: Optional[float] = Query(None, description="Maximum depth value"),
-    page: int = Query(1, ge=1, description="Page number"),
-    per_page: int = Query(100, ge=1, le=1000, description="Items per page (max 1000)"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous response's next_cursor"),
+    page: Optional[int] = Query(None, ge=1, description="Page number (deprecated, use cursor)"),
+    per_page: int = Query(
+        100, ge=1, le=settings.frames_max_binary_rows,
+        description=f"Items per page (max {settings.frames_max_json_rows} for JSON)"
+    ),
     coloredmap: Optional[bool] = Query(None, description="Return colormap pixels (true) or grayscale pixels (false)"),
+    colormap: Optional[schemas.ColormapEnum] = Query(None, description="Render colormap pixels on the fly from grayscale"),
+    include_total: bool = Query(True, description="Compute total and total_pages for the depth range"),
+    resolution: Optional[int] = Query(
+        None, ge=1, description="Minimum frames needed across the depth range; serves the coarsest pyramid level"
+    ),
+    width: Optional[int] = Query(
+        None, ge=1, le=settings.frames_max_width, description="Resample the frames to this width on read"
+    ),
+    format: Optional[FrameFormat] = Query(None, description="Response format; overrides the Accept header"),
     frame_service: FrameService = Depends()
 ):
     try:
-        frames, total, total_pages = frame_service.get_frames_with_filters(
+        frame_format = negotiate_frame_format(format, request.headers.get("accept"))
+        check_page_size(frame_format, per_page, settings.frames_max_json_rows)
+        if width is not None and frame_format == FrameFormat.ndjson:
+            raise HTTPException(status_code=400, detail="width is not supported for NDJSON responses")
+        colormap_name = colormap.value if colormap is not None else None
+        if colormap_name is not None:
+            coloredmap = False
+        level = await frame_service.select_level(image_id, depth_min, depth_max, resolution, coloredmap)
+
+        if frame_format == FrameFormat.ndjson:
+            frames = await frame_service.iter_frames_with_filters(
+                image_id=image_id,
+                depth_min=depth_min,
+                depth_max=depth_max,
+                limit=per_page + 1,
+                coloredmap=coloredmap,
+                cursor=cursor,
+                level=level
+            )
+            return ndjson_response(frames, per_page, coloredmap, colormap_name, level)
+
+        frames, total, total_pages, next_cursor = await frame_service.get_frames_with_filters(
             image_id=image_id,
             depth_min=depth_min,
             depth_max=depth_max,
             page=page,
             per_page=per_page,
-            coloredmap=coloredmap
+            coloredmap=coloredmap,
+            cursor=cursor,
+            include_total=include_total,
+            level=level,
+            width=width
         )
 
-        if total == 0:
-            return schemas.FramesQueryResponse(
-                frames=[],
-                count=0,
-                total=0,
-                page=page,
-                per_page=per_page,
-                total_pages=0
-            )
+        if frame_format in (FrameFormat.binary, FrameFormat.npy):
+            matrix = frame_matrix(frames, colormap_name)
+            headers = pagination_headers(len(frames), total, next_cursor, level)
+            if frame_format == FrameFormat.binary:
+                return binary_response(frames, matrix, headers)
+            return npy_response(frames, matrix, headers)
 
+        ids, depths = frames.ids.tolist(), frames.depths.tolist()
         frame_responses = []
-        if coloredmap is True:
+        if colormap_name is not None:
+            rgb_matrix = frame_matrix(frames, colormap_name)
             frame_responses = [
                 schemas.FrameResponse(
-                    id=frame.id,
-                    image_id=frame.image_id,
-                    depth=frame.depth,
+                    id=ids[i],
+                    image_id=image_id,
+                    depth=depths[i],
                     pixels=[],
-                    color_map_pixels=frame.color_map_pixels if frame.color_map_pixels is not None else [],
-                    colormap_name=frame.colormap_name,
-                    created_at=frame.created_at,
-                    colormap_applied_at=frame.colormap_applied_at
-                ) for frame in frames
+                    color_map_pixels=rgb_matrix[i].tolist(),
+                    colormap_name=colormap_name,
+                    created_at=frames.created_at[i],
+                    colormap_applied_at=None
+                ) for i in range(len(frames))
+            ]
+        elif coloredmap is True:
+            frame_responses = [
+                schemas.FrameResponse(
+                    id=ids[i],
+                    image_id=image_id,
+                    depth=depths[i],
+                    pixels=[],
+                    color_map_pixels=frames.matrix[i].tolist() if frames.has_color[i] else [],
+                    colormap_name=frames.colormap_names[i],
+                    created_at=frames.created_at[i],
+                    colormap_applied_at=frames.colormap_applied_at[i]
+                ) for i in range(len(frames))
             ]
         else:
             frame_responses = [
                 schemas.FrameResponse(
-                    id=frame.id,
-                    image_id=frame.image_id,
-                    depth=frame.depth,
-                    pixels=frame.pixels,
+                    id=ids[i],
+                    image_id=image_id,
+                    depth=depths[i],
+                    pixels=frames.matrix[i].tolist(),
                     color_map_pixels=[],
-                    colormap_name=frame.colormap_name,
-                    created_at=frame.created_at,
-                    colormap_applied_at=frame.colormap_applied_at
-                ) for frame in frames
+                    colormap_name=frames.colormap_names[i],
+                    created_at=frames.created_at[i],
+                    colormap_applied_at=frames.colormap_applied_at[i]
+                ) for i in range(len(frames))
             ]
 
         return schemas.FramesQueryResponse(
@@ -94,7 +214,9 @@ async def get_frames(
             total=total,
             page=page,
             per_page=per_page,
-            total_pages=total_pages
+            total_pages=total_pages,
+            next_cursor=next_cursor,
+            level=level
         )
     except HTTPException:
         raise
@@ -103,25 +225,62 @@ async def get_frames(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/colormap/apply", response_model=schemas.ColorMapResponse)
-async def apply_colormap(
+@router.get("/cache/frames", response_model=schemas.CacheStatsResponse)
+async def get_frame_cache_stats():
+    return schemas.CacheStatsResponse(**frame_block_cache.stats())
+
+
+@router.get("/db/pools", response_model=Dict[str, schemas.PoolStatsResponse])
+async def get_db_pool_stats():
+    return get_pool_stats()
+
+
+@router.get(
+    "/images/{image_id}/render",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}, "image/webp": {}}}, 304: {"description": "Not modified"}}
+)
+async def render_image(
+    request: Request,
+    image_id: int,
+    depth_min: Optional[float] = Query(None, description="Minimum depth value"),
+    depth_max: Optional[float] = Query(None, description="Maximum depth value"),
+    colormap: Optional[schemas.ColormapEnum] = Query(None, description="Colormap to apply; grayscale if omitted"),
+    height: Optional[int] = Query(None, ge=1, le=settings.render_max_height, description="Output height in pixels"),
+    format: RenderFormat = Query(RenderFormat.png, description="Image encoding"),
+    renderer: ImageRenderer = Depends()
+):
+    try:
+        image = await renderer.get_image(image_id)
+        colormap_name = colormap.value if colormap is not None else None
+        etag = renderer.etag(image, depth_min, depth_max, colormap_name, height, format)
+        headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+
+        if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers=headers)
+
+        height, level = await renderer.plan(image, depth_min, depth_max, height, format)
+        content = await renderer.render(image_id, depth_min, depth_max, colormap_name, height, format, level)
+        return Response(content=content, media_type=f"image/{format.value}", headers=headers)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in render_image endpoint: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/colormap/apply", response_model=schemas.ColormapJobResponse, status_code=202)
+def apply_colormap(
     request: schemas.ColorMapRequest = Body(...),
     colormap_service: ColorMapProcessor = Depends()
 ):
     try:
-        result = colormap_service.apply_colormap_to_image(
+        colormap_job = colormap_service.start_colormap_job(
             request.image_id,
             request.colormap.value,
             request.batch_size
         )
-
-        return schemas.ColorMapResponse(
-            message=f"Successfully applied '{request.colormap.value}' colormap",
-            image_id=request.image_id,
-            processed=result['processed'],
-            total=result['total'],
-            colormap_applied=request.colormap.value
-        )
+        return schemas.ColormapJobResponse.model_validate(colormap_job)
 
     except HTTPException:
         raise
@@ -130,3 +289,10 @@ async def apply_colormap(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/colormap/jobs/{job_id}", response_model=schemas.ColormapJobResponse)
+def get_colormap_job(
+    job_id: int,
+    colormap_service: ColorMapProcessor = Depends()
+):
+    colormap_job = colormap_service.get_colormap_job(job_id)
+    return schemas.ColormapJobResponse.model_validate(colormap_job)
@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from enum import Enum
+from src.services.job_manager import JobStatus
 
 
 class ColormapEnum(str, Enum):
@@ -26,15 +27,47 @@ class ColormapEnum(str, Enum):
     terrain = "terrain"
 
 
+class SourceFormatEnum(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
+    npy = "npy"
+    raw = "raw"
+
+
 class ResizeRequest(BaseModel):
     target_width: int = Field(default=150, description="Target width for resizing")
+    source: str = Field(default="data.csv", description="Source file, relative to the ingest data directory")
+    format: Optional[SourceFormatEnum] = Field(default=None, description="Source format; inferred from the extension if omitted")
+    workers: int = Field(default=1, ge=1, description="Processes parsing the CSV; 1 parses it in the job thread")
+    ordered: bool = Field(default=True, description="Write parallel-parsed ranges in file order")
 
 
-class ResizeResponse(BaseModel):
-    message: str
-    image_id: int
+class DeriveRequest(BaseModel):
+    target_width: int = Field(..., ge=1, description="Width of the derived image")
+
+
+class WorkerStatsResponse(BaseModel):
+    rows: int
+    seconds: float
+    throughput: float = Field(description="Rows parsed per second of worker time")
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: JobStatus
+    image_id: Optional[int] = None
     frames_processed: int
-    target_width: int
+    rows_dropped: int
+    ingest_mode: Optional[str] = Field(default=None, description="created, appended, derived or reused")
+    throughput: float = Field(description="Frames processed per second")
+    elapsed_seconds: float
+    error: Optional[str] = None
+    workers: Dict[str, WorkerStatsResponse] = Field(default_factory=dict)
+    profile_id: Optional[str] = Field(default=None, description="Profile kept for this job, from /api/v1/admin/profiles")
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class FrameResponse(BaseModel):
@@ -54,10 +87,12 @@ class FrameResponse(BaseModel):
 class FramesQueryResponse(BaseModel):
     frames: List[FrameResponse]
     count: int
-    total: int
-    page: int
+    total: Optional[int] = None
+    page: Optional[int] = None
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = Field(default=None, description="Pass as `cursor` to fetch the next page")
+    level: int = Field(default=0, description="Pyramid level served; level L averages 2^L frames")
 
 
 class ColorMapRequest(BaseModel):
@@ -66,9 +101,52 @@ class ColorMapRequest(BaseModel):
     batch_size: int = Field(default=100, description="Batch size for processing")
 
 
-class ColorMapResponse(BaseModel):
-    message: str
+class ColormapJobResponse(BaseModel):
+    job_id: int = Field(validation_alias="id")
     image_id: int
+    colormap_name: str
+    batch_size: int
+    status: str
     processed: int
     total: int
-    colormap_applied: str
\ No newline at end of file
+    last_frame_id: int
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class CacheStatsResponse(BaseModel):
+    entries: int
+    bytes: int
+    max_bytes: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class PoolStatsResponse(BaseModel):
+    size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    saturation: float
+    checkouts: int
+    timeouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+
+
+class ProfileResponse(BaseModel):
+    id: str
+    kind: str = Field(description="request or job")
+    name: str = Field(description="Method and route template, or job kind and id")
+    mode: str = Field(description="sample or cprofile")
+    trigger: str = Field(description="requested, sampled or slow")
+    duration_ms: float
+    samples: int = Field(description="Stack sampling ticks, or function calls recorded by cProfile")
+    formats: List[str]
+    created_at: datetime
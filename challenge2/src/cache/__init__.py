@@ -0,0 +1,14 @@
+from .frame_count_cache import FrameCountCache
+from .frame_block_cache import FrameBlock, FrameBlockCache
+from .backends import CacheBackend, InMemoryBackend, RedisBackend, create_backend
+from .shared_cache import SharedCache
+from .freshness import ReplicaFreshness
+from .invalidation import (
+    frame_count_cache, frame_block_cache, shared_cache, replica_freshness, mark_image_dirty, invalidate_image
+)
+
+__all__ = [
+    "FrameCountCache", "FrameBlock", "FrameBlockCache",
+    "CacheBackend", "InMemoryBackend", "RedisBackend", "create_backend", "SharedCache", "ReplicaFreshness",
+    "frame_count_cache", "frame_block_cache", "shared_cache", "replica_freshness", "mark_image_dirty", "invalidate_image"
+]
@@ -0,0 +1,113 @@
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Minimal bytes key/value store used by the shared cache tier.
+
+    `shared` tells whether other processes see the same keys; frame blocks
+    are only worth serializing into a backend that is shared.
+    """
+    shared = False
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        ...
+
+    @abstractmethod
+    def incr(self, key: str) -> int:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+
+class InMemoryBackend(CacheBackend):
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Optional[float], bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            expires_at, value = self._entries.get(key, (None, b"0"))
+            value = str(int(value) + 1).encode()
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            return int(value)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class RedisBackend(CacheBackend):
+    """
+    Backend over any client speaking the redis-py API (Redis, Valkey, KeyDB, fakeredis).
+    """
+    shared = True
+
+    def __init__(self, client):
+        self.client = client
+
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        import redis
+
+        return cls(redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0))
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[int] = None) -> None:
+        self.client.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
+    def delete(self, key: str) -> None:
+        self.client.delete(key)
+
+
+def create_backend(name: str, redis_url: Optional[str], max_entries: int) -> CacheBackend:
+    if name == "redis":
+        if not redis_url:
+            raise ValueError("REDIS_URL must be set when CACHE_BACKEND=redis")
+        logger.info("Using Redis cache backend")
+        return RedisBackend.from_url(redis_url)
+    if name == "memory":
+        return InMemoryBackend(max_entries)
+    raise ValueError(f"Unknown cache backend: {name}")
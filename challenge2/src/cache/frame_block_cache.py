@@ -0,0 +1,201 @@
+import json
+import struct
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+# Rough per-row cost of the Python objects kept next to the arrays.
+ROW_OVERHEAD_BYTES = 160
+
+
+@dataclass(frozen=True)
+class FrameBlock:
+    """
+    A decoded, depth-ordered page of frames.
+
+    `matrix` is N x W grayscale, or N x W x 3 RGB for colormap reads, where
+    `has_color` marks the rows that had a materialized colormap. Arrays are
+    read-only because cached blocks are shared between requests.
+    """
+    image_id: int
+    ids: np.ndarray
+    depths: np.ndarray
+    matrix: np.ndarray
+    has_color: Optional[np.ndarray]
+    colormap_names: Tuple[Optional[str], ...]
+    created_at: Tuple[Optional[datetime], ...]
+    colormap_applied_at: Tuple[Optional[datetime], ...]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [self.ids, self.depths, self.matrix]
+        if self.has_color is not None:
+            arrays.append(self.has_color)
+        return sum(array.nbytes for array in arrays) + len(self) * ROW_OVERHEAD_BYTES
+
+    def head(self, count: int) -> "FrameBlock":
+        return replace(
+            self,
+            ids=self.ids[:count],
+            depths=self.depths[:count],
+            matrix=self.matrix[:count],
+            has_color=self.has_color[:count] if self.has_color is not None else None,
+            colormap_names=self.colormap_names[:count],
+            created_at=self.created_at[:count],
+            colormap_applied_at=self.colormap_applied_at[:count]
+        )
+
+    def with_matrix(self, matrix: np.ndarray) -> "FrameBlock":
+        matrix.setflags(write=False)
+        return replace(self, matrix=matrix)
+
+    def to_bytes(self) -> bytes:
+        """
+        Serialize as a length-prefixed JSON header followed by the raw little-endian arrays.
+        """
+        header = json.dumps({
+            "image_id": self.image_id,
+            "shape": self.matrix.shape,
+            "has_color": self.has_color is not None,
+            "colormap_names": self.colormap_names,
+            "created_at": [_isoformat(value) for value in self.created_at],
+            "colormap_applied_at": [_isoformat(value) for value in self.colormap_applied_at],
+        }).encode()
+        arrays = [self.ids.astype("<i8"), self.depths.astype("<f8"), np.ascontiguousarray(self.matrix)]
+        if self.has_color is not None:
+            arrays.append(self.has_color.astype(np.uint8))
+        return struct.pack("<I", len(header)) + header + b"".join(array.tobytes() for array in arrays)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "FrameBlock":
+        (header_size,) = struct.unpack_from("<I", data)
+        offset = 4 + header_size
+        header = json.loads(data[4:offset])
+        shape = tuple(header["shape"])
+        count = shape[0]
+
+        def take(dtype, shape):
+            nonlocal offset
+            array = np.frombuffer(data, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+            offset += array.nbytes
+            return array
+
+        ids = take("<i8", (count,))
+        depths = take("<f8", (count,))
+        matrix = take(np.uint8, shape)
+        has_color = take(np.bool_, (count,)) if header["has_color"] else None
+
+        return cls(
+            image_id=header["image_id"],
+            ids=ids,
+            depths=depths,
+            matrix=matrix,
+            has_color=has_color,
+            colormap_names=tuple(header["colormap_names"]),
+            created_at=tuple(_parse_datetime(value) for value in header["created_at"]),
+            colormap_applied_at=tuple(_parse_datetime(value) for value in header["colormap_applied_at"])
+        )
+
+    @classmethod
+    def from_rows(cls, image_id: int, rows: List, matrix: np.ndarray, has_color: Optional[np.ndarray] = None):
+        ids = np.fromiter((row.id for row in rows), dtype=np.int64, count=len(rows))
+        depths = np.fromiter((row.depth for row in rows), dtype=np.float64, count=len(rows))
+        for array in (ids, depths, matrix, has_color):
+            if array is not None:
+                array.setflags(write=False)
+
+        return cls(
+            image_id=image_id,
+            ids=ids,
+            depths=depths,
+            matrix=matrix,
+            has_color=has_color,
+            colormap_names=tuple(row.colormap_name for row in rows),
+            created_at=tuple(row.created_at for row in rows),
+            colormap_applied_at=tuple(row.colormap_applied_at for row in rows)
+        )
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def _parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value is not None else None
+
+
+class FrameBlockCache:
+    """
+    LRU cache of decoded frame blocks bounded by their total size in bytes.
+
+    Each image has a generation number that invalidation bumps; a block read
+    under an older generation is not stored, so a read that raced a write
+    cannot cache pre-commit frames.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._blocks: "OrderedDict[Tuple[int, Hashable], FrameBlock]" = OrderedDict()
+        self._generations: Dict[int, int] = {}
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    def generation(self, image_id: int) -> int:
+        with self._lock:
+            return self._generations.get(image_id, 0)
+
+    def get(self, image_id: int, key: Hashable) -> Optional[FrameBlock]:
+        with self._lock:
+            block = self._blocks.get((image_id, key))
+            if block is None:
+                self._misses += 1
+                return None
+            self._blocks.move_to_end((image_id, key))
+            self._hits += 1
+            return block
+
+    def set(self, image_id: int, key: Hashable, block: FrameBlock, generation: int) -> None:
+        size = block.nbytes
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if self._generations.get(image_id, 0) != generation:
+                return
+
+            previous = self._blocks.pop((image_id, key), None)
+            if previous is not None:
+                self._bytes -= previous.nbytes
+            self._blocks[(image_id, key)] = block
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self._bytes -= evicted.nbytes
+                self._evictions += 1
+
+    def invalidate_image(self, image_id: int) -> None:
+        with self._lock:
+            self._generations[image_id] = self._generations.get(image_id, 0) + 1
+            for key in [key for key in self._blocks if key[0] == image_id]:
+                self._bytes -= self._blocks.pop(key).nbytes
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._blocks),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+            }
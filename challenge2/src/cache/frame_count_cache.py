@@ -0,0 +1,55 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+CountKey = Tuple[int, Optional[float], Optional[float], int, Optional[int]]
+
+
+class FrameCountCache:
+    """
+    LRU cache of range totals.
+
+    Keys carry the image's shared cache version, so a write committed by another
+    worker retires counts here too; `invalidate_image` only covers this process.
+    """
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._counts: "OrderedDict[CountKey, int]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        level: int = 0,
+        version: Optional[int] = None
+    ) -> Optional[int]:
+        key = (image_id, depth_min, depth_max, level, version)
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def set(
+        self,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        count: int,
+        level: int = 0,
+        version: Optional[int] = None
+    ) -> None:
+        key = (image_id, depth_min, depth_max, level, version)
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+    def invalidate_image(self, image_id: int) -> None:
+        with self._lock:
+            for key in [key for key in self._counts if key[0] == image_id]:
+                del self._counts[key]
@@ -0,0 +1,40 @@
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from src.cache.frame_block_cache import FrameBlockCache
+from src.cache.shared_cache import SharedCache
+
+Stamp = Tuple[Optional[int], int]
+
+
+class ReplicaFreshness:
+    """
+    Tells whether an image was written too recently for the read replica to be trusted.
+
+    An image's write stamp is its shared cache version and local block cache generation,
+    both bumped after the primary commits. The first time this process sees a new stamp,
+    the replica may still lag behind that commit, so reads (and the cache entries they
+    fill) should use the primary until `max_lag` has passed.
+    """
+
+    def __init__(self, shared_cache: SharedCache, block_cache: FrameBlockCache, max_lag: float, enabled: bool):
+        self.shared_cache = shared_cache
+        self.block_cache = block_cache
+        self.max_lag = max_lag
+        self.enabled = enabled
+        self._seen: Dict[int, Tuple[Stamp, float]] = {}
+        self._lock = threading.Lock()
+
+    async def recently_written(self, image_id: int) -> bool:
+        if not self.enabled:
+            return False
+
+        stamp = (await self.shared_cache.version_async(image_id), self.block_cache.generation(image_id))
+        now = time.monotonic()
+        with self._lock:
+            seen = self._seen.get(image_id)
+            # An image this process has not seen yet may just have been written by another one.
+            if seen is None or seen[0] != stamp:
+                self._seen[image_id] = (stamp, now)
+                return True
+            return now - seen[1] < self.max_lag
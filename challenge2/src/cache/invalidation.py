@@ -0,0 +1,52 @@
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from src.cache.backends import create_backend
+from src.cache.frame_block_cache import FrameBlockCache
+from src.cache.frame_count_cache import FrameCountCache
+from src.cache.freshness import ReplicaFreshness
+from src.cache.shared_cache import SharedCache
+from src.config import settings
+
+frame_count_cache = FrameCountCache(max_entries=settings.frame_count_cache_size)
+frame_block_cache = FrameBlockCache(max_bytes=settings.frame_cache_max_mb * 1024 * 1024)
+shared_cache = SharedCache(
+    create_backend(settings.cache_backend, settings.redis_url, settings.cache_memory_max_entries),
+    image_ttl=settings.cache_image_ttl_seconds,
+    frames_ttl=settings.cache_frames_ttl_seconds
+)
+replica_freshness = ReplicaFreshness(
+    shared_cache,
+    frame_block_cache,
+    max_lag=settings.database_replica_max_lag_seconds,
+    enabled=settings.database_replica_url is not None
+)
+
+DIRTY_IMAGES_KEY = "dirty_images"
+
+
+def mark_image_dirty(session: Session, image_id: int) -> None:
+    """
+    Record that the session wrote frames of `image_id`.
+
+    Caches are invalidated only once the transaction commits, so a reader
+    running concurrently with the write cannot repopulate them with
+    pre-commit values.
+    """
+    session.info.setdefault(DIRTY_IMAGES_KEY, set()).add(image_id)
+
+
+def invalidate_image(image_id: int) -> None:
+    frame_count_cache.invalidate_image(image_id)
+    frame_block_cache.invalidate_image(image_id)
+    shared_cache.bump_version(image_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    for image_id in session.info.pop(DIRTY_IMAGES_KEY, ()):
+        invalidate_image(image_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(DIRTY_IMAGES_KEY, None)
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable, Optional
+from sqlalchemy import DateTime
+from starlette.concurrency import run_in_threadpool
+from src.cache.backends import CacheBackend
+from src.cache.frame_block_cache import FrameBlock
+from src.models import Image
+
+logger = logging.getLogger(__name__)
+
+
+class SharedCache:
+    """
+    Image metadata and serialized frame blocks in a CacheBackend.
+
+    Every key embeds the image's version number. Invalidation only increments
+    the version, so workers sharing the backend stop reading the old entries
+    at once and the TTL reclaims them.
+    """
+
+    def __init__(self, backend: CacheBackend, image_ttl: int, frames_ttl: int):
+        self.backend = backend
+        self.image_ttl = image_ttl
+        self.frames_ttl = frames_ttl
+
+    @property
+    def shared(self) -> bool:
+        return self.backend.shared
+
+    def version(self, image_id: int) -> Optional[int]:
+        """
+        Current version of an image's entries, or None when the backend is unavailable.
+        """
+        try:
+            value = self.backend.get(f"image:{image_id}:version")
+        except Exception as e:
+            logger.warning(f"Cache backend unavailable, bypassing cache: {e}")
+            return None
+        return int(value) if value is not None else 0
+
+    def bump_version(self, image_id: int) -> None:
+        try:
+            self.backend.incr(f"image:{image_id}:version")
+        except Exception as e:
+            logger.error(f"Failed to invalidate cached entries of image {image_id}: {e}")
+
+    def get_frame_block(self, image_id: int, version: int, key: Hashable) -> Optional[FrameBlock]:
+        data = self._get(self._frames_key(image_id, version, key))
+        return FrameBlock.from_bytes(data) if data is not None else None
+
+    def set_frame_block(self, image_id: int, version: int, key: Hashable, block: FrameBlock) -> None:
+        self._set(self._frames_key(image_id, version, key), block.to_bytes(), self.frames_ttl)
+
+    # Async counterparts for request handlers; a shared backend does network I/O, so it runs off the event loop.
+
+    async def version_async(self, image_id: int) -> Optional[int]:
+        return await self._offload(self.version, image_id)
+
+    async def get_image_async(
+        self,
+        image_id: int,
+        loader: Callable[[int], Awaitable[Optional[Image]]]
+    ) -> Optional[Image]:
+        """
+        Return the image from the cache, falling back to `loader` and caching its result.
+
+        Cached images are detached copies carrying only column values.
+        """
+        version = await self.version_async(image_id)
+        if version is None:
+            return await loader(image_id)
+
+        key = f"image:{image_id}:v{version}:meta"
+        data = await self._offload(self._get, key)
+        if data is not None:
+            return self._load_image(data)
+
+        image = await loader(image_id)
+        if image is not None:
+            await self._offload(self._set, key, self._dump_image(image), self.image_ttl)
+        return image
+
+    async def get_frame_block_async(self, image_id: int, version: int, key: Hashable) -> Optional[FrameBlock]:
+        return await self._offload(self.get_frame_block, image_id, version, key)
+
+    async def set_frame_block_async(self, image_id: int, version: int, key: Hashable, block: FrameBlock) -> None:
+        await self._offload(self.set_frame_block, image_id, version, key, block)
+
+    async def _offload(self, fn: Callable, *args):
+        if self.backend.shared:
+            return await run_in_threadpool(fn, *args)
+        return fn(*args)
+
+    @staticmethod
+    def _frames_key(image_id: int, version: int, key: Hashable) -> str:
+        return f"frames:{image_id}:v{version}:{hashlib.sha1(repr(key).encode()).hexdigest()}"
+
+    def _get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"Cache read of {key} failed: {e}")
+            return None
+
+    def _set(self, key: str, value: bytes, ttl: int) -> None:
+        try:
+            self.backend.set(key, value, ttl)
+        except Exception as e:
+            logger.warning(f"Cache write of {key} failed: {e}")
+
+    @staticmethod
+    def _dump_image(image: Image) -> bytes:
+        values = {}
+        for column in Image.__table__.columns:
+            value = getattr(image, column.key)
+            values[column.key] = value.isoformat() if isinstance(value, datetime) else value
+        return json.dumps(values).encode()
+
+    @staticmethod
+    def _load_image(data: bytes) -> Image:
+        values = json.loads(data)
+        for column in Image.__table__.columns:
+            if isinstance(column.type, DateTime) and values.get(column.key) is not None:
+                values[column.key] = datetime.fromisoformat(values[column.key])
+        return Image(**values)
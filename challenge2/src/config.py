@@ -1,13 +1,54 @@
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     database_url: str
+    database_replica_url: Optional[str] = None
+    database_replica_max_lag_seconds: float = 5.0
     postgres_user: str
     postgres_password: str
     postgres_db: str
     api_port: int = 8000
+    db_read_pool_size: int = 20
+    db_read_max_overflow: int = 20
+    db_read_pool_timeout: int = 5
+    db_write_pool_size: int = 5
+    db_write_max_overflow: int = 5
+    db_write_pool_timeout: int = 10
+    db_bulk_pool_size: int = 4
+    db_bulk_max_overflow: int = 2
+    db_bulk_pool_timeout: int = 60
     debug: bool = False
+    ingest_data_dir: str = "."
+    ingest_chunk_rows: int = 10000
+    ingest_flush_rows: int = 50000
+    ingest_max_processes: int = 8
+    ingest_range_bytes: int = 64 * 1024 * 1024
+    job_workers: int = 2
+    colormap_job_stale_seconds: int = 300
+    colormap_workers: int = 4
+    colormap_queue_depth: int = 4
+    frame_count_cache_size: int = 4096
+    frame_cache_max_mb: int = 256
+    cache_backend: str = "memory"
+    redis_url: Optional[str] = None
+    cache_memory_max_entries: int = 10000
+    cache_image_ttl_seconds: int = 60
+    cache_frames_ttl_seconds: int = 300
+    frames_max_json_rows: int = 1000
+    frames_max_binary_rows: int = 100000
+    frames_max_width: int = 2048
+    render_max_height: int = 8192
+    pyramid_max_levels: int = 8
+    pyramid_min_rows: int = 256
+    pyramid_chunk_rows: int = 16384
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_slow_request_ms: Optional[float] = None
+    profiling_slow_job_seconds: Optional[float] = None
+    profiling_interval_ms: float = 10.0
+    profiling_max_profiles: int = 50
 
     class Config:
         env_file = ".env"
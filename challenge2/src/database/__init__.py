@@ -1,3 +1,9 @@
-from .connection import engine, SessionLocal, Base, get_db
+from .connection import (
+    engine, SessionLocal, bulk_engine, BulkSessionLocal, async_engine, async_primary_engine, AsyncSessionLocal,
+    Base, get_db, get_async_db, get_pool_stats, route_reads_to_primary
+)
 
-__all__ = ["engine", "SessionLocal", "Base", "get_db"]
\ No newline at end of file
+__all__ = [
+    "engine", "SessionLocal", "bulk_engine", "BulkSessionLocal", "async_engine", "async_primary_engine",
+    "AsyncSessionLocal", "Base", "get_db", "get_async_db", "get_pool_stats", "route_reads_to_primary"
+]
@@ -1,17 +1,78 @@
+from typing import Dict, Optional
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from src.config import settings
+from src.database.pools import PoolStats, timed_pool_class
 
-engine = create_engine(
-    settings.database_url,
-    pool_size=20,
-    max_overflow=30,
-    pool_pre_ping=True,
-    pool_recycle=3600
-)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+pool_stats: Dict[str, PoolStats] = {name: PoolStats(name) for name in ("read", "read_primary", "write", "bulk")}
+
+PRIMARY_READS_KEY = "primary_reads"
+
+
+def async_database_url(database_url: str) -> str:
+    url = make_url(database_url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.get_backend_name(), url.drivername)).render_as_string(
+        hide_password=False
+    )
+
+
+def pool_options(name: str, pool_class, settings_name: Optional[str] = None) -> dict:
+    settings_name = settings_name or name
+    return {
+        "poolclass": timed_pool_class(pool_class, pool_stats[name]),
+        "pool_size": getattr(settings, f"db_{settings_name}_pool_size"),
+        "max_overflow": getattr(settings, f"db_{settings_name}_max_overflow"),
+        "pool_timeout": getattr(settings, f"db_{settings_name}_pool_timeout"),
+        "pool_pre_ping": True,
+        "pool_recycle": 3600,
+    }
+
+
+# Short transactional writes from request handlers (colormap job bookkeeping, image records).
+engine = create_engine(settings.database_url, **pool_options("write", QueuePool))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Long ingest, colormap and pyramid transactions get their own pool so they cannot starve request traffic.
+bulk_engine = create_engine(settings.database_url, **pool_options("bulk", QueuePool))
+BulkSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=bulk_engine)
+
+# Request handlers await reads on the async engine, pointed at a replica when one is configured.
+async_engine = create_async_engine(
+    async_database_url(settings.database_replica_url or settings.database_url),
+    **pool_options("read", AsyncAdaptedQueuePool)
+)
+
+# With a replica, reads of recently written images go to the primary until the replica has caught up.
+async_primary_engine = create_async_engine(
+    async_database_url(settings.database_url),
+    **pool_options("read_primary", AsyncAdaptedQueuePool, settings_name="read")
+) if settings.database_replica_url else None
+
+
+class ReadSession(Session):
+    """
+    Binds to the read engine, or to the primary once `route_reads_to_primary` was called.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if async_primary_engine is not None and self.info.get(PRIMARY_READS_KEY):
+            return async_primary_engine.sync_engine
+        return async_engine.sync_engine
+
+
+AsyncSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=ReadSession, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
 
 
@@ -20,4 +81,20 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def route_reads_to_primary(db: AsyncSession) -> None:
+    db.sync_session.info[PRIMARY_READS_KEY] = True
+
+
+def get_pool_stats() -> Dict[str, dict]:
+    pools = {"read": async_engine.pool, "write": engine.pool, "bulk": bulk_engine.pool}
+    if async_primary_engine is not None:
+        pools["read_primary"] = async_primary_engine.pool
+    return {name: pool_stats[name].snapshot(pool) for name, pool in pools.items()}
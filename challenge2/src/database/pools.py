@@ -0,0 +1,73 @@
+import threading
+import time
+from typing import Dict, Type
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+
+class PoolStats:
+    """
+    Checkout wait times and timeouts of one named connection pool.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: Pool) -> Dict:
+        # QueuePool reports the configured size and current overflow; other pool classes report neither.
+        size = pool.size() if hasattr(pool, "size") else 0
+        max_overflow = getattr(pool, "_max_overflow", 0)
+        checked_out = pool.checkedout() if hasattr(pool, "checkedout") else 0
+        capacity = size + max(max_overflow, 0)
+
+        with self._lock:
+            return {
+                "size": size,
+                "max_overflow": max_overflow,
+                "checked_out": checked_out,
+                "overflow": max(pool.overflow(), 0) if hasattr(pool, "overflow") else 0,
+                "saturation": checked_out / capacity if capacity > 0 else 0.0,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+
+class TimedPoolMixin:
+    stats: PoolStats
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_wait(time.perf_counter() - start)
+        return connection
+
+
+def timed_pool_class(pool_class: Type[Pool], stats: PoolStats) -> Type[Pool]:
+    """
+    Subclass `pool_class` so every checkout records its wait into `stats`.
+
+    The stats live on the class because pools are rebuilt with
+    `self.__class__(...)` when an engine is disposed.
+    """
+    return type(f"Timed{pool_class.__name__}", (TimedPoolMixin, pool_class), {"stats": stats})
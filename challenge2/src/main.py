@@ -1,11 +1,16 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import uvicorn
 import logging
-from src.api import router
-from src.database import Base, engine
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from src.api import router, admin_router
+from src.database import Base, engine, bulk_engine, async_engine, async_primary_engine
 from src.config import settings
+from src.metrics import MetricsMiddleware, registry
+from src.profiling import ProfilingMiddleware, profiler
+from src.services import ColorMapProcessor, job_manager
+from src.utils import ColormapHandler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,7 +21,17 @@ async def lifespan(app: FastAPI):
     logger.info("Starting application...")
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created/verified")
+    ColormapHandler.precompute_luts()
+    resumed = ColorMapProcessor.resume_pending_jobs()
+    if resumed:
+        logger.info(f"Resumed {resumed} colormap jobs")
     yield
+    job_manager.shutdown()
+    await async_engine.dispose()
+    if async_primary_engine is not None:
+        await async_primary_engine.dispose()
+    bulk_engine.dispose()
+    engine.dispose()
 
 
 app = FastAPI(
@@ -26,6 +41,10 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Added first, so it is innermost and profiles cover the handler rather than the other middleware.
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -34,7 +53,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(router)
+if settings.profiling_enabled:
+    app.include_router(admin_router)
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # CONTENT_TYPE_LATEST already carries the charset, which media_type would append a second time.
+    return Response(content=generate_latest(registry), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
 
 if __name__ == "__main__":
     uvicorn.run(
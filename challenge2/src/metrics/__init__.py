@@ -0,0 +1,14 @@
+from .registry import (
+    registry, ingest_batch_seconds, colormap_batch_seconds, http_request_seconds, http_response_bytes, PoolCollector
+)
+from .middleware import MetricsMiddleware
+
+__all__ = [
+    "registry",
+    "ingest_batch_seconds",
+    "colormap_batch_seconds",
+    "http_request_seconds",
+    "http_response_bytes",
+    "PoolCollector",
+    "MetricsMiddleware",
+]
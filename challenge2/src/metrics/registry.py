@@ -0,0 +1,74 @@
+from typing import Iterator
+from prometheus_client import CollectorRegistry, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, Metric
+from src.database import get_pool_stats
+
+# Batches run from milliseconds (small colormap batches) to tens of seconds (large ingest flushes).
+BATCH_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+registry = CollectorRegistry(auto_describe=True)
+
+ingest_batch_seconds = Histogram(
+    "ingest_batch_seconds",
+    "Time per ingest batch by stage: parse (read and validate), resize, insert",
+    ["stage"],
+    buckets=BATCH_BUCKETS,
+    registry=registry
+)
+
+colormap_batch_seconds = Histogram(
+    "colormap_batch_seconds",
+    "Time per colormap batch by stage: read, compute, update (bulk update and checkpoint commit)",
+    ["stage"],
+    buckets=BATCH_BUCKETS,
+    registry=registry
+)
+
+http_request_seconds = Histogram(
+    "http_request_seconds",
+    "Time from receiving a request to sending the last body byte",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry
+)
+
+http_response_bytes = Histogram(
+    "http_response_bytes",
+    "Response body size",
+    ["method", "route"],
+    buckets=BYTES_BUCKETS,
+    registry=registry
+)
+
+
+class PoolCollector:
+    """
+    Reads the connection pool statistics at scrape time, so checkouts pay nothing extra.
+    """
+
+    def collect(self) -> Iterator[Metric]:
+        gauges = {
+            "size": GaugeMetricFamily("db_pool_size", "Configured pool size", labels=["pool"]),
+            "checked_out": GaugeMetricFamily("db_pool_checked_out", "Connections checked out", labels=["pool"]),
+            "overflow": GaugeMetricFamily("db_pool_overflow", "Connections open beyond the pool size", labels=["pool"]),
+            "saturation": GaugeMetricFamily(
+                "db_pool_saturation", "Checked-out share of size plus max overflow", labels=["pool"]
+            ),
+        }
+        checkouts = CounterMetricFamily("db_pool_checkouts", "Connection checkouts", labels=["pool"])
+        timeouts = CounterMetricFamily("db_pool_timeouts", "Checkouts that timed out waiting", labels=["pool"])
+
+        for name, stats in get_pool_stats().items():
+            for key, gauge in gauges.items():
+                gauge.add_metric([name], stats[key])
+            checkouts.add_metric([name], stats["checkouts"])
+            timeouts.add_metric([name], stats["timeouts"])
+
+        yield from gauges.values()
+        yield checkouts
+        yield timeouts
+
+
+registry.register(PoolCollector())
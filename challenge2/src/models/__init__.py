@@ -1,4 +1,6 @@
 from .image import Image
 from .image_frame import ImageFrame
+from .image_frame_level import ImageFrameLevel
+from .colormap_job import ColormapJob, ColormapJobStatus
 
-__all__ = ["Image", "ImageFrame"]
\ No newline at end of file
+__all__ = ["Image", "ImageFrame", "ImageFrameLevel", "ColormapJob", "ColormapJobStatus"]
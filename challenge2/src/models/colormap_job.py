@@ -0,0 +1,35 @@
+from enum import Enum
+from sqlalchemy import Column, Integer, DateTime, String, Text, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from src.database.connection import Base
+
+
+class ColormapJobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class ColormapJob(Base):
+    __tablename__ = "colormap_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    image_id = Column(Integer, ForeignKey('images.id', ondelete='CASCADE'), nullable=False)
+    colormap_name = Column(String(50), nullable=False)
+    batch_size = Column(Integer, nullable=False)
+    status = Column(String(20), nullable=False, default=ColormapJobStatus.pending.value)
+    last_frame_id = Column(Integer, nullable=False, default=0)
+    processed = Column(Integer, nullable=False, default=0)
+    total = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    image = relationship("Image")
+
+    __table_args__ = (
+        Index('idx_colormap_job_image_status', 'image_id', 'status'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, String
+from sqlalchemy import Column, Integer, BigInteger, Float, DateTime, String, Index, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.database.connection import Base
@@ -11,6 +11,19 @@ class Image(Base):
     target_width = Column(Integer, nullable=False)
     total_frames = Column(Integer, nullable=False, default=0)
     csv_source = Column(String(255), nullable=True)
+    pyramid_levels = Column(Integer, nullable=False, default=0)
+    # Fingerprint of the ingested source bytes; set when the ingest commits, so partial loads never match.
+    source_hash = Column(String(64), nullable=True)
+    source_size = Column(BigInteger, nullable=True)
+    source_mtime = Column(Float, nullable=True)
+    # Image whose stored frames were resampled to produce this one, instead of reading the source.
+    derived_from_id = Column(Integer, ForeignKey('images.id', ondelete='SET NULL'), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
-    frames = relationship("ImageFrame", back_populates="image", cascade="all, delete-orphan")
\ No newline at end of file
+    # Frames are removed by ImageFrameRepository.delete_by_image or the database cascade, never loaded for deletion.
+    frames = relationship("ImageFrame", back_populates="image", cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        Index('idx_image_source_hash', 'source_hash', 'target_width'),
+        Index('idx_image_derived_from', 'derived_from_id', 'target_width'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, JSON, DateTime, Index, String, ForeignKey
+from sqlalchemy import Column, Integer, Float, LargeBinary, DateTime, Index, String, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.database.connection import Base
@@ -10,8 +10,9 @@ class ImageFrame(Base):
     id = Column(Integer, primary_key=True, index=True)
     image_id = Column(Integer, ForeignKey('images.id', ondelete='CASCADE'), nullable=False, index=True)
     depth = Column(Float, nullable=False, index=True)
-    pixels = Column(JSON, nullable=False)
-    color_map_pixels = Column(JSON, nullable=True)
+    width = Column(Integer, nullable=False)
+    pixels = Column(LargeBinary, nullable=False)
+    color_map_pixels = Column(LargeBinary, nullable=True)
     colormap_name = Column(String(50), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     colormap_applied_at = Column(DateTime(timezone=True), nullable=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, Float, LargeBinary, DateTime, Index, ForeignKey
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from src.database.connection import Base
+
+
+class ImageFrameLevel(Base):
+    __tablename__ = "image_frame_levels"
+
+    id = Column(Integer, primary_key=True, index=True)
+    image_id = Column(Integer, ForeignKey('images.id', ondelete='CASCADE'), nullable=False)
+    level = Column(Integer, nullable=False)
+    depth = Column(Float, nullable=False)
+    width = Column(Integer, nullable=False)
+    pixels = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    image = relationship("Image")
+
+    __table_args__ = (
+        Index('idx_level_image_depth', 'image_id', 'level', 'depth'),
+    )
@@ -0,0 +1,21 @@
+from .sampler import StackSampler, StackSamples
+from .profiler import (
+    Profile, ProfileFormat, ProfileMode, ProfileSession, ProfileTrigger, Profiler, profiler, requested_profile
+)
+from .middleware import ProfilingMiddleware, PROFILE_HEADER, PROFILE_ID_HEADER
+
+__all__ = [
+    "StackSampler",
+    "StackSamples",
+    "Profile",
+    "ProfileFormat",
+    "ProfileMode",
+    "ProfileSession",
+    "ProfileTrigger",
+    "Profiler",
+    "profiler",
+    "requested_profile",
+    "ProfilingMiddleware",
+    "PROFILE_HEADER",
+    "PROFILE_ID_HEADER",
+]
@@ -0,0 +1,68 @@
+from typing import Optional
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from src.config import settings
+from src.profiling.profiler import Profiler, ProfileMode, requested_profile
+
+PROFILE_HEADER = "x-profile"
+PROFILE_ID_HEADER = "x-profile-id"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles requests that ask for it with an `X-Profile` header, a configured share of all
+    requests, and, with a slow threshold set, keeps the profile of any request that exceeds it.
+
+    Only installed when profiling is enabled, so it costs nothing otherwise.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Profiler, excluded_prefixes: tuple = ("/api/v1/admin", "/metrics")):
+        self.app = app
+        self.profiler = profiler
+        self.excluded_prefixes = excluded_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.excluded_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        requested = self.requested_mode(Headers(scope=scope).get(PROFILE_HEADER))
+        mode, trigger = self.profiler.choose(requested)
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = self.profiler.start(mode)
+
+        async def send_wrapper(message: Message) -> None:
+            # Profiles kept regardless of latency are announced up front so the caller can fetch them.
+            if message["type"] == "http.response.start" and trigger is not None:
+                message.setdefault("headers", []).append((PROFILE_ID_HEADER.encode(), session.id.encode()))
+            await send(message)
+
+        # `X-Profile: cprofile` still applies to the jobs this request submits.
+        token = requested_profile.set(requested)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            requested_profile.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            slow_ms = settings.profiling_slow_request_ms
+            self.profiler.finish(
+                session,
+                "request",
+                f"{scope['method']} {route}",
+                trigger,
+                slow_ms / 1000 if slow_ms is not None else None
+            )
+
+    @staticmethod
+    def requested_mode(value: Optional[str]) -> Optional[ProfileMode]:
+        if not value:
+            return None
+        value = value.strip().lower()
+        if value in ("0", "false", "no", "off"):
+            return None
+        if value == ProfileMode.cprofile.value:
+            return ProfileMode.cprofile
+        return ProfileMode.sample
@@ -0,0 +1,239 @@
+import cProfile
+import io
+import logging
+import marshal
+import pstats
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple
+from src.config import settings
+from src.profiling.sampler import StackSampler, StackSamples
+
+logger = logging.getLogger(__name__)
+
+
+class ProfileMode(str, Enum):
+    sample = "sample"
+    cprofile = "cprofile"
+
+
+class ProfileTrigger(str, Enum):
+    requested = "requested"
+    sampled = "sampled"
+    slow = "slow"
+
+
+class ProfileFormat(str, Enum):
+    collapsed = "collapsed"
+    text = "text"
+    pstats = "pstats"
+
+
+# Set while a request asked for a profile, so jobs it submits are profiled the same way.
+requested_profile: ContextVar[Optional[ProfileMode]] = ContextVar("requested_profile", default=None)
+
+
+@dataclass
+class Profile:
+    id: str
+    kind: str
+    name: str
+    mode: ProfileMode
+    trigger: ProfileTrigger
+    duration_ms: float
+    samples: int
+    collapsed: Optional[str] = field(default=None, repr=False)
+    stats: Optional[Dict] = field(default=None, repr=False)
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def formats(self) -> List[ProfileFormat]:
+        if self.mode == ProfileMode.cprofile:
+            return [ProfileFormat.text, ProfileFormat.pstats]
+        return [ProfileFormat.collapsed]
+
+    def text(self, limit: int = 60) -> str:
+        out = io.StringIO()
+        pstats.Stats(_StatsHolder(self.stats), stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def pstats_bytes(self) -> bytes:
+        # The same layout cProfile.Profile.dump_stats writes, readable by pstats and snakeviz.
+        return marshal.dumps(self.stats)
+
+
+class _StatsHolder:
+
+    def __init__(self, stats: Dict):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class ProfileSession:
+    """
+    One running profile: either stack samples of every thread, or cProfile of the calling job thread.
+
+    cProfile hooks a single thread and only one profiler may hook it at a time, so a
+    second cProfile request on a busy thread falls back to sampling.
+    """
+
+    _cprofile_threads = set()
+    _cprofile_guard = threading.Lock()
+
+    def __init__(self, sampler: StackSampler, mode: ProfileMode):
+        self.id = uuid.uuid4().hex
+        self.mode = mode
+        self.sampler = sampler
+        self._profile: Optional[cProfile.Profile] = None
+        self._samples: Optional[StackSamples] = None
+        self._thread = threading.get_ident()
+        self._started = time.perf_counter()
+        self.elapsed = 0.0
+
+        if mode == ProfileMode.cprofile and self._claim_thread():
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self.mode = ProfileMode.sample
+            self._samples = sampler.subscribe()
+
+    def stop(self) -> float:
+        self.elapsed = time.perf_counter() - self._started
+        if self._profile is not None:
+            self._profile.disable()
+            with self._cprofile_guard:
+                self._cprofile_threads.discard(self._thread)
+        else:
+            self.sampler.unsubscribe(self._samples)
+        return self.elapsed
+
+    def to_profile(self, kind: str, name: str, trigger: ProfileTrigger) -> Profile:
+        profile = Profile(
+            id=self.id,
+            kind=kind,
+            name=name,
+            mode=self.mode,
+            trigger=trigger,
+            duration_ms=self.elapsed * 1000,
+            samples=0
+        )
+        if self._profile is not None:
+            self._profile.create_stats()
+            profile.stats = self._profile.stats
+            profile.samples = sum(calls for _, calls, _, _, _ in profile.stats.values())
+        else:
+            profile.collapsed = self._samples.collapsed()
+            profile.samples = self._samples.ticks
+        return profile
+
+    def _claim_thread(self) -> bool:
+        with self._cprofile_guard:
+            if self._thread in self._cprofile_threads:
+                return False
+            self._cprofile_threads.add(self._thread)
+            return True
+
+
+class Profiler:
+    """
+    Decides which requests and jobs to profile and keeps the most recent profiles in memory.
+
+    A profile is taken when the caller asks for one, when the configured sample rate picks
+    it, or, with a slow threshold set, for every request or job; those that finish under
+    the threshold are discarded.
+    """
+
+    def __init__(self, max_profiles: int, interval: float):
+        self.max_profiles = max_profiles
+        self.sampler = StackSampler(interval)
+        self._profiles: "OrderedDict[str, Profile]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def choose(self, requested: Optional[ProfileMode]) -> Tuple[Optional[ProfileMode], Optional[ProfileTrigger]]:
+        """
+        Pick the mode and up-front trigger for a request, or (None, None) to leave it unprofiled.
+
+        A (mode, None) result profiles the request only to keep it if it turns out slow.
+        Requests are always stack-sampled: cProfile would only see the event loop thread,
+        missing work offloaded to the threadpool and counting other requests' coroutines.
+        """
+        if requested is not None:
+            return ProfileMode.sample, ProfileTrigger.requested
+        if settings.profiling_sample_rate and random.random() < settings.profiling_sample_rate:
+            return ProfileMode.sample, ProfileTrigger.sampled
+        if settings.profiling_slow_request_ms is not None:
+            return ProfileMode.sample, None
+        return None, None
+
+    def start(self, mode: ProfileMode) -> ProfileSession:
+        return ProfileSession(self.sampler, mode)
+
+    def finish(
+        self,
+        session: ProfileSession,
+        kind: str,
+        name: str,
+        trigger: Optional[ProfileTrigger],
+        slow_seconds: Optional[float]
+    ) -> Optional[Profile]:
+        elapsed = session.stop()
+        if trigger is None and slow_seconds is not None and elapsed >= slow_seconds:
+            trigger = ProfileTrigger.slow
+        if trigger is None:
+            return None
+
+        profile = session.to_profile(kind, name, trigger)
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.max_profiles:
+                self._profiles.popitem(last=False)
+        logger.info(f"Kept {profile.mode.value} profile {profile.id} of {kind} {name} ({trigger.value}, {profile.duration_ms:.0f}ms)")
+        return profile
+
+    @contextmanager
+    def profile_job(self, job) -> Iterator[None]:
+        """
+        Profile a background job the request that submitted it asked for, or one that runs past the slow threshold.
+        """
+        slow_seconds = settings.profiling_slow_job_seconds
+        if not settings.profiling_enabled or (job.profile is None and slow_seconds is None):
+            yield
+            return
+
+        session = self.start(job.profile or ProfileMode.sample)
+        trigger = ProfileTrigger.requested if job.profile is not None else None
+        try:
+            yield
+        finally:
+            profile = self.finish(session, "job", f"{job.kind} {job.id}", trigger, slow_seconds)
+            if profile is not None:
+                job.profile_id = profile.id
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return self._profiles.get(profile_id)
+
+    def recent(self) -> List[Profile]:
+        with self._lock:
+            return list(reversed(self._profiles.values()))
+
+    def clear(self) -> int:
+        with self._lock:
+            count = len(self._profiles)
+            self._profiles.clear()
+        return count
+
+
+profiler = Profiler(
+    max_profiles=settings.profiling_max_profiles,
+    interval=settings.profiling_interval_ms / 1000
+)
@@ -0,0 +1,108 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import CodeType, FrameType
+from typing import Dict, List, Set
+
+
+class StackSamples:
+    """
+    Collapsed stacks gathered for one subscriber, in the `frame;frame;frame count` format
+    that flamegraph.pl and speedscope read.
+    """
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.ticks = 0
+
+    def add(self, stacks: List[str]) -> None:
+        self.counts.update(stacks)
+        self.ticks += 1
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+
+class StackSampler:
+    """
+    Samples the Python stack of every thread at a fixed interval.
+
+    The sampling thread only runs while someone is subscribed, so nothing is
+    sampled while no profile is being taken; it lingers briefly after the last
+    one leaves so back-to-back requests do not start a thread each. Each tick
+    is walked once and shared by all subscribers.
+    """
+
+    def __init__(self, interval: float, linger: float = 1.0):
+        self.interval = interval
+        self.linger = linger
+        self._subscribers: Set[StackSamples] = set()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._labels: Dict[CodeType, str] = {}
+
+    def subscribe(self) -> StackSamples:
+        samples = StackSamples()
+        with self._lock:
+            self._subscribers.add(samples)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return samples
+
+    def unsubscribe(self, samples: StackSamples) -> None:
+        with self._lock:
+            self._subscribers.discard(samples)
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        idle_since = None
+        while True:
+            with self._lock:
+                if self._subscribers:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since >= self.linger:
+                    self._thread = None
+                    return
+
+            if idle_since is None:
+                stacks = self.collect(own_ident)
+                # Added under the lock so a subscriber's samples are final once unsubscribe returns.
+                with self._lock:
+                    for samples in self._subscribers:
+                        samples.add(stacks)
+            time.sleep(self.interval)
+
+    def collect(self, skip_ident: int) -> List[str]:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        stacks = []
+        for ident, frame in sys._current_frames().items():
+            if ident != skip_ident:
+                stacks.append(self.collapse(frame, names.get(ident, f"thread-{ident}")))
+        return stacks
+
+    def collapse(self, frame: FrameType, thread_name: str) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                label = self._labels[code] = f"{code.co_qualname} ({self.short_path(code.co_filename)}:{code.co_firstlineno})"
+            labels.append(label)
+            frame = frame.f_back
+        # Rooting each stack at its thread keeps the event loop, threadpool and job threads apart.
+        labels.append(thread_name)
+        return ";".join(reversed(labels))
+
+    @staticmethod
+    def short_path(path: str) -> str:
+        marker = f"site-packages{os.sep}"
+        if marker in path:
+            return path.split(marker, 1)[1]
+        if path.startswith(os.getcwd()):
+            return os.path.relpath(path)
+        return os.path.basename(path)
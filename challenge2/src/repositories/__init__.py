@@ -1,5 +1,13 @@
 from src.repositories.base_repository import BaseRepository
+from src.repositories.async_base_repository import AsyncBaseRepository
 from src.repositories.image_frame_repository import ImageFrameRepository
+from src.repositories.async_image_frame_repository import AsyncImageFrameRepository
+from src.repositories.image_frame_level_repository import ImageFrameLevelRepository
 from src.repositories.image_repository import ImageRepository
+from src.repositories.async_image_repository import AsyncImageRepository
+from src.repositories.colormap_job_repository import ColormapJobRepository
 
-__all__ = ['BaseRepository', 'ImageFrameRepository', 'ImageRepository']
\ No newline at end of file
+__all__ = [
+    'BaseRepository', 'AsyncBaseRepository', 'ImageFrameRepository', 'AsyncImageFrameRepository',
+    'ImageFrameLevelRepository', 'ImageRepository', 'AsyncImageRepository', 'ColormapJobRepository'
+]
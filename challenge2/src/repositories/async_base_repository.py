@@ -0,0 +1,25 @@
+from typing import TypeVar, Generic, Type, Optional, List
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+T = TypeVar('T')
+
+
+class AsyncBaseRepository(Generic[T]):
+    """
+    Read-only: async sessions may be bound to a read replica, so writes go through BaseRepository.
+    """
+
+    def __init__(self, db_session: AsyncSession, model: Type[T]):
+        self.db = db_session
+        self.model = model
+
+    async def get_by_id(self, id: int) -> Optional[T]:
+        return await self.db.get(self.model, id)
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[T]:
+        result = await self.db.execute(select(self.model).offset(skip).limit(limit))
+        return list(result.scalars())
+
+    async def count(self) -> int:
+        return await self.db.scalar(select(func.count(self.model.id)))
@@ -0,0 +1,107 @@
+from typing import AsyncIterator, List, Optional, Tuple
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends
+from src.cache import FrameBlock
+from src.database import get_async_db
+from src.models import ImageFrame
+from src.repositories.async_base_repository import AsyncBaseRepository
+from src.repositories.image_frame_repository import ImageFrameRepository
+
+
+class AsyncImageFrameRepository(AsyncBaseRepository[ImageFrame]):
+    """
+    Read path of ImageFrameRepository for request handlers, built on the same statements.
+    """
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        super().__init__(db, ImageFrame)
+
+    async def get_frames_with_filters(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0
+    ) -> List[ImageFrame]:
+        result = await self.db.execute(ImageFrameRepository.frames_select(
+            image_id, depth_min, depth_max, skip, limit, coloredmap, after, level
+        ))
+        return result.all()
+
+    async def get_frame_block(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0
+    ) -> FrameBlock:
+        rows = await self.get_frames_with_filters(
+            image_id, depth_min, depth_max, skip, limit, coloredmap, after, level
+        )
+        return ImageFrameRepository.frame_block(image_id, rows, coloredmap, level)
+
+    async def iter_frames_with_filters(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0,
+        chunk_size: int = 500
+    ) -> AsyncIterator[ImageFrame]:
+        result = await self.db.stream(
+            ImageFrameRepository.frames_select(image_id, depth_min, depth_max, skip, limit, coloredmap, after, level)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for row in result:
+            yield row
+
+    async def iter_depth_blocks(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0,
+        chunk_size: int = 5000
+    ) -> AsyncIterator[Tuple[np.ndarray, np.ndarray]]:
+        result = await self.db.stream(
+            ImageFrameRepository.depth_blocks_select(image_id, depth_min, depth_max, level)
+            .execution_options(yield_per=chunk_size)
+        )
+        async for chunk in result.partitions(chunk_size):
+            yield ImageFrameRepository.depth_block(chunk)
+
+    async def get_depth_matrix(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        blocks = [block async for block in self.iter_depth_blocks(image_id, depth_min, depth_max, level)]
+        return ImageFrameRepository.concat_depth_blocks(blocks)
+
+    async def count_frames_in_range(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0
+    ) -> int:
+        return await self.db.scalar(ImageFrameRepository.count_select(image_id, depth_min, depth_max, level))
+
+    async def count_frames_by_image(self, image_id: int) -> int:
+        return await self.db.scalar(select(func.count(self.model.id)).filter(self.model.image_id == image_id))
@@ -0,0 +1,11 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import Depends
+from src.database import get_async_db
+from src.models import Image
+from src.repositories.async_base_repository import AsyncBaseRepository
+
+
+class AsyncImageRepository(AsyncBaseRepository[Image]):
+
+    def __init__(self, db: AsyncSession = Depends(get_async_db)):
+        super().__init__(db, Image)
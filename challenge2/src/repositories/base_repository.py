@@ -1,9 +1,14 @@
-from typing import TypeVar, Generic, Type, Optional, List, Dict, Any
+import io
+from typing import TypeVar, Generic, Type, Optional, List, Dict, Any, Tuple
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
 T = TypeVar('T')
 
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+COPY_BINARY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+
 
 class BaseRepository(Generic[T]):
 
@@ -40,9 +45,10 @@ class BaseRepository(Generic[T]):
             self.db.refresh(instance)
         return instance
 
-    def bulk_update(self, mappings: List[Dict[str, Any]]) -> None:
+    def bulk_update(self, mappings: List[Dict[str, Any]], commit: bool = True) -> None:
         self.db.bulk_update_mappings(self.model, mappings)
-        self.db.commit()
+        if commit:
+            self.db.commit()
 
     def delete(self, id: int) -> bool:
         instance = self.get_by_id(id)
@@ -57,5 +63,47 @@ class BaseRepository(Generic[T]):
         self.db.commit()
         return count
 
+    @property
+    def is_postgres(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def copy_binary(self, columns: List[Tuple[str, Any, Any]], row_count: int, table: Optional[str] = None) -> None:
+        """
+        Stream rows into the model's table with COPY ... FROM STDIN (FORMAT binary).
+
+        Each column is (name, big-endian numpy dtype, values). Every tuple has a
+        fixed size, so the whole payload is laid out as one structured array
+        instead of being formatted row by row. Rows go to `table` when given,
+        otherwise to the model's table. The caller owns the transaction.
+        """
+        fields = [('field_count', '>i2')]
+        for name, dtype, _ in columns:
+            fields += [(f'{name}_len', '>i4'), (name, np.dtype(dtype))]
+
+        tuples = np.empty(row_count, dtype=fields)
+        tuples['field_count'] = len(columns)
+        for name, _, values in columns:
+            tuples[f'{name}_len'] = tuples.dtype[name].itemsize
+            tuples[name] = values
+
+        buffer = io.BytesIO()
+        buffer.write(COPY_BINARY_HEADER)
+        buffer.write(tuples.tobytes())
+        buffer.write(COPY_BINARY_TRAILER)
+        buffer.seek(0)
+
+        column_names = ", ".join(name for name, _, _ in columns)
+        cursor = self.db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table or self.model.__tablename__} ({column_names}) FROM STDIN WITH (FORMAT binary)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    def commit(self) -> None:
+        self.db.commit()
+
     def rollback(self) -> None:
         self.db.rollback()
\ No newline at end of file
@@ -0,0 +1,82 @@
+from typing import List, Optional
+from datetime import datetime, timezone
+from sqlalchemy.orm import Session
+from sqlalchemy import or_, and_
+from fastapi import Depends
+from src.database import get_db
+from src.models import ColormapJob, ColormapJobStatus
+from src.repositories.base_repository import BaseRepository
+
+ACTIVE_STATUSES = (ColormapJobStatus.pending.value, ColormapJobStatus.running.value)
+
+
+class ColormapJobRepository(BaseRepository[ColormapJob]):
+
+    def __init__(self, db: Session = Depends(get_db)):
+        super().__init__(db, ColormapJob)
+
+    def create_job(self, image_id: int, colormap_name: str, batch_size: int, total: int) -> ColormapJob:
+        return self.create(
+            image_id=image_id,
+            colormap_name=colormap_name,
+            batch_size=batch_size,
+            total=total,
+            status=ColormapJobStatus.pending.value
+        )
+
+    def get_active_for_image(self, image_id: int) -> Optional[ColormapJob]:
+        return self.db.query(self.model).filter(
+            self.model.image_id == image_id,
+            self.model.status.in_(ACTIVE_STATUSES)
+        ).first()
+
+    def get_latest(self, image_id: int, colormap_name: str) -> Optional[ColormapJob]:
+        return self.db.query(self.model).filter(
+            self.model.image_id == image_id,
+            self.model.colormap_name == colormap_name
+        ).order_by(self.model.id.desc()).first()
+
+    def get_resumable(self) -> List[ColormapJob]:
+        return self.db.query(self.model).filter(
+            self.model.status.in_(ACTIVE_STATUSES)
+        ).order_by(self.model.id).all()
+
+    def claim(self, job_id: int, stale_before: datetime) -> bool:
+        """
+        Atomically move a job to running.
+
+        A running job can only be claimed once its last checkpoint is older
+        than `stale_before`, so two workers never process the same job.
+        """
+        claimed = self.db.query(self.model).filter(
+            self.model.id == job_id,
+            or_(
+                self.model.status == ColormapJobStatus.pending.value,
+                and_(
+                    self.model.status == ColormapJobStatus.running.value,
+                    self.model.updated_at < stale_before
+                )
+            )
+        ).update({
+            self.model.status: ColormapJobStatus.running.value,
+            self.model.updated_at: datetime.now(timezone.utc)
+        }, synchronize_session=False)
+        self.db.commit()
+        return claimed == 1
+
+    def checkpoint(self, job_id: int, last_frame_id: int, processed: int) -> None:
+        self.db.query(self.model).filter(self.model.id == job_id).update({
+            self.model.last_frame_id: last_frame_id,
+            self.model.processed: processed,
+            self.model.updated_at: datetime.now(timezone.utc)
+        }, synchronize_session=False)
+        self.db.commit()
+
+    def set_status(self, job_id: int, status: ColormapJobStatus, error: str = None) -> Optional[ColormapJob]:
+        finished = status in (ColormapJobStatus.completed, ColormapJobStatus.failed)
+        return self.update(
+            job_id,
+            status=status.value,
+            error=error,
+            finished_at=datetime.now(timezone.utc) if finished else None
+        )
@@ -0,0 +1,48 @@
+from sqlalchemy.orm import Session
+import numpy as np
+from fastapi import Depends
+from src.cache import mark_image_dirty
+from src.database import get_db
+from src.models import ImageFrameLevel
+from src.repositories.base_repository import BaseRepository
+
+
+class ImageFrameLevelRepository(BaseRepository[ImageFrameLevel]):
+
+    def __init__(self, db: Session = Depends(get_db)):
+        super().__init__(db, ImageFrameLevel)
+
+    def insert_level(self, image_id: int, level: int, depths: np.ndarray, pixels: np.ndarray) -> None:
+        if len(depths) == 0:
+            return
+
+        mark_image_dirty(self.db, image_id)
+        width = pixels.shape[1]
+        if self.is_postgres:
+            self.copy_binary([
+                ('image_id', '>i4', image_id),
+                ('level', '>i4', level),
+                ('depth', '>f8', depths),
+                ('width', '>i4', width),
+                ('pixels', ('u1', (width,)), pixels),
+            ], len(depths))
+        else:
+            self.db.bulk_insert_mappings(ImageFrameLevel, [
+                {
+                    'image_id': image_id,
+                    'level': level,
+                    'depth': float(depth),
+                    'width': width,
+                    'pixels': row.tobytes()
+                }
+                for depth, row in zip(depths, pixels)
+            ])
+
+    def delete_by_image(self, image_id: int, commit: bool = True) -> int:
+        count = self.db.query(self.model).filter(
+            self.model.image_id == image_id
+        ).delete()
+        mark_image_dirty(self.db, image_id)
+        if commit:
+            self.db.commit()
+        return count
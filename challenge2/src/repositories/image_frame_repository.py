@@ -1,14 +1,18 @@
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import Select, bindparam, func, null, or_, select, text, tuple_, update
 from datetime import datetime
+import numpy as np
 from fastapi import Depends
+from src.cache import FrameBlock, mark_image_dirty
 from src.database import get_db
-from src.models import ImageFrame
+from src.models import ImageFrame, ImageFrameLevel
 from src.repositories.base_repository import BaseRepository
+from src.utils.pixel_codec import PixelCodec, RGB_CHANNELS
 
 
 class ImageFrameRepository(BaseRepository[ImageFrame]):
+    _partitioned: Optional[bool] = None
 
     def __init__(self, db: Session = Depends(get_db)):
         super().__init__(db, ImageFrame)
@@ -26,100 +30,448 @@ class ImageFrameRepository(BaseRepository[ImageFrame]):
         depth_max: Optional[float] = None,
         skip: int = 0,
         limit: int = 100,
-        coloredmap: Optional[bool] = None
-    ) -> Tuple[List[ImageFrame], int]:
-        if coloredmap is True:
-            query = self.db.query(
-                self.model.id,
-                self.model.image_id,
-                self.model.depth,
-                self.model.color_map_pixels,
-                self.model.colormap_name,
-                self.model.created_at,
-                self.model.colormap_applied_at
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0
+    ) -> List[ImageFrame]:
+        return self.db.execute(
+            self.frames_select(image_id, depth_min, depth_max, skip, limit, coloredmap, after, level)
+        ).all()
+
+    def get_frame_block(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0
+    ) -> FrameBlock:
+        rows = self.get_frames_with_filters(image_id, depth_min, depth_max, skip, limit, coloredmap, after, level)
+        return self.frame_block(image_id, rows, coloredmap, level)
+
+    def iter_frames_with_filters(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        skip: int = 0,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        after: Optional[Tuple[float, int]] = None,
+        level: int = 0,
+        chunk_size: int = 500
+    ) -> Iterator[ImageFrame]:
+        # yield_per streams rows from a server-side cursor instead of buffering the whole result.
+        return iter(self.db.execute(
+            self.frames_select(image_id, depth_min, depth_max, skip, limit, coloredmap, after, level)
+            .execution_options(yield_per=chunk_size)
+        ))
+
+    def iter_depth_blocks(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0,
+        chunk_size: int = 5000
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream the grayscale frames of a depth range as depth-ordered (depths, N x W matrix) blocks.
+
+        Every block except the last holds exactly `chunk_size` rows.
+        """
+        result = self.db.execute(
+            self.depth_blocks_select(image_id, depth_min, depth_max, level)
+            .execution_options(yield_per=chunk_size)
+        )
+
+        for chunk in result.partitions(chunk_size):
+            yield self.depth_block(chunk)
+
+    def get_depth_matrix(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        return self.concat_depth_blocks(list(self.iter_depth_blocks(image_id, depth_min, depth_max, level)))
+
+    def count_frames_in_range(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        level: int = 0
+    ) -> int:
+        return self.db.execute(self.count_select(image_id, depth_min, depth_max, level)).scalar()
+
+    # Statement builders and row decoders below are shared with AsyncImageFrameRepository.
+
+    @classmethod
+    def frames_select(
+        cls,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        skip: int,
+        limit: int,
+        coloredmap: Optional[bool],
+        after: Optional[Tuple[float, int]],
+        level: int = 0
+    ) -> Select:
+        model = cls.level_model(level)
+
+        if level > 0:
+            # Pyramid rows carry grayscale pixels only.
+            stmt = select(
+                model.id,
+                model.image_id,
+                model.depth,
+                model.width,
+                model.pixels,
+                null().label('colormap_name'),
+                model.created_at,
+                null().label('colormap_applied_at')
+            )
+        elif coloredmap is True:
+            stmt = select(
+                model.id,
+                model.image_id,
+                model.depth,
+                model.width,
+                model.color_map_pixels,
+                model.colormap_name,
+                model.created_at,
+                model.colormap_applied_at
             )
         else:
-            query = self.db.query(
-                self.model.id,
-                self.model.image_id,
-                self.model.depth,
-                self.model.pixels,
-                self.model.colormap_name,
-                self.model.created_at,
-                self.model.colormap_applied_at
+            stmt = select(
+                model.id,
+                model.image_id,
+                model.depth,
+                model.width,
+                model.pixels,
+                model.colormap_name,
+                model.created_at,
+                model.colormap_applied_at
+            )
+
+        stmt = stmt.filter(*cls.depth_range(image_id, depth_min, depth_max, level))
+
+        if after is not None:
+            after_depth, after_id = after
+            # The plain depth bound lets the planner start an idx_image_depth range scan at the cursor.
+            stmt = stmt.filter(
+                model.depth >= after_depth,
+                tuple_(model.depth, model.id) > tuple_(after_depth, after_id)
             )
+            skip = 0
+
+        return stmt.order_by(model.depth, model.id).offset(skip).limit(limit)
 
-        query = query.filter(self.model.image_id == image_id)
+    @classmethod
+    def depth_blocks_select(
+        cls,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        level: int = 0
+    ) -> Select:
+        model = cls.level_model(level)
+        return select(model.depth, model.width, model.pixels).filter(
+            *cls.depth_range(image_id, depth_min, depth_max, level)
+        ).order_by(model.depth, model.id)
 
+    @classmethod
+    def count_select(
+        cls,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        level: int = 0
+    ) -> Select:
+        # count(*) over the (image_id, depth) predicate never touches the pixel columns.
+        return select(func.count()).select_from(cls.level_model(level)).filter(
+            *cls.depth_range(image_id, depth_min, depth_max, level)
+        )
+
+    @staticmethod
+    def level_model(level: int):
+        return ImageFrame if level == 0 else ImageFrameLevel
+
+    @classmethod
+    def depth_range(
+        cls,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        level: int = 0
+    ) -> list:
+        model = cls.level_model(level)
+        conditions = [model.image_id == image_id]
+        if level > 0:
+            conditions.append(model.level == level)
         if depth_min is not None:
-            query = query.filter(self.model.depth >= depth_min)
+            conditions.append(model.depth >= depth_min)
         if depth_max is not None:
-            query = query.filter(self.model.depth <= depth_max)
+            conditions.append(model.depth <= depth_max)
+        return conditions
 
-        total = query.count()
-        frames = query.order_by(self.model.depth).offset(skip).limit(limit).all()
+    @classmethod
+    def frame_block(cls, image_id: int, rows: List, coloredmap: Optional[bool], level: int = 0) -> FrameBlock:
+        if coloredmap is True and level == 0:
+            has_color = np.fromiter(
+                (row.color_map_pixels is not None for row in rows), dtype=bool, count=len(rows)
+            )
+            return FrameBlock.from_rows(image_id, rows, cls.color_map_matrix(rows), has_color)
+        return FrameBlock.from_rows(image_id, rows, cls.pixels_matrix(rows))
 
-        return frames, total
+    @classmethod
+    def depth_block(cls, rows: List) -> Tuple[np.ndarray, np.ndarray]:
+        return np.fromiter((row.depth for row in rows), dtype=np.float64, count=len(rows)), cls.pixels_matrix(rows)
+
+    @staticmethod
+    def concat_depth_blocks(blocks: List[Tuple[np.ndarray, np.ndarray]]) -> Tuple[np.ndarray, np.ndarray]:
+        if not blocks:
+            return np.empty(0, dtype=np.float64), np.empty((0, 0), dtype=np.uint8)
+        return np.concatenate([depths for depths, _ in blocks]), np.concatenate([pixels for _, pixels in blocks])
 
     def get_frames_batch(
         self,
         image_id: int,
-        offset: int,
+        after_id: int,
         limit: int,
-        include_pixels: bool = True
+        include_pixels: bool = True,
+        skip_colormap: Optional[str] = None
     ) -> List[ImageFrame]:
         if include_pixels:
             query = self.db.query(
                 self.model.id,
+                self.model.width,
                 self.model.pixels
-            ).filter(
-                self.model.image_id == image_id,
-                self.model.pixels.isnot(None)
             )
         else:
-            query = self.db.query(self.model).filter(
-                self.model.image_id == image_id
-            )
+            query = self.db.query(self.model)
 
-        return query.order_by(self.model.id).offset(offset).limit(limit).all()
+        query = query.filter(
+            self.model.image_id == image_id,
+            self.model.id > after_id
+        )
+        if skip_colormap is not None:
+            query = query.filter(self._needs_colormap(skip_colormap))
+
+        return query.order_by(self.model.id).limit(limit).all()
+
+    def count_frames_needing_colormap(self, image_id: int, colormap_name: str) -> int:
+        return self.db.query(func.count(self.model.id)).filter(
+            self.model.image_id == image_id,
+            self._needs_colormap(colormap_name)
+        ).scalar()
+
+    def _needs_colormap(self, colormap_name: str):
+        return or_(
+            self.model.colormap_name.is_(None),
+            self.model.colormap_name != colormap_name
+        )
+
+    @staticmethod
+    def pixels_array(frame) -> np.ndarray:
+        return PixelCodec.unpack(frame.pixels, frame.width)
+
+    @staticmethod
+    def pixels_matrix(frames: List[ImageFrame]) -> np.ndarray:
+        """
+        Stack the grayscale rows of same-width frames into one N x W uint8 matrix.
+        """
+        if not frames:
+            return np.empty((0, 0), dtype=np.uint8)
+        return np.frombuffer(b"".join(frame.pixels for frame in frames), dtype=np.uint8).reshape(
+            len(frames), frames[0].width
+        )
+
+    @staticmethod
+    def color_map_matrix(frames: List[ImageFrame]) -> np.ndarray:
+        """
+        Stack materialized RGB rows into an N x W x 3 matrix; frames without one are zero-filled.
+        """
+        if not frames:
+            return np.empty((0, 0, RGB_CHANNELS), dtype=np.uint8)
+        width = frames[0].width
+        matrix = np.zeros((len(frames), width, RGB_CHANNELS), dtype=np.uint8)
+        for row, frame in zip(matrix, frames):
+            if frame.color_map_pixels is not None:
+                row[:] = PixelCodec.unpack(frame.color_map_pixels, width, RGB_CHANNELS)
+        return matrix
+
+    @staticmethod
+    def color_map_array(frame) -> Optional[np.ndarray]:
+        if frame.color_map_pixels is None:
+            return None
+        return PixelCodec.unpack(frame.color_map_pixels, frame.width, RGB_CHANNELS)
 
     def update_colormap_batch(
         self,
+        image_id: int,
         frame_updates: List[dict],
         colormap_name: str,
-        timestamp: datetime
+        timestamp: datetime,
+        commit: bool = True
     ) -> None:
         updates = []
-        for update in frame_updates:
+        for frame_update in frame_updates:
             updates.append({
-                'id': update['id'],
-                'color_map_pixels': update['color_map_pixels'],
+                'frame_id': frame_update['id'],
+                'color_map_pixels': PixelCodec.pack(frame_update['color_map_pixels']),
                 'colormap_name': colormap_name,
                 'colormap_applied_at': timestamp
             })
 
         if updates:
-            self.bulk_update(updates)
+            mark_image_dirty(self.db, image_id)
+            # Matching on image_id as well as id lets Postgres prune to the image's partition.
+            self.db.execute(
+                update(self.model.__table__)
+                .where(self.model.image_id == image_id, self.model.id == bindparam('frame_id'))
+                .values(
+                    color_map_pixels=bindparam('color_map_pixels'),
+                    colormap_name=bindparam('colormap_name'),
+                    colormap_applied_at=bindparam('colormap_applied_at')
+                ),
+                updates
+            )
+            if commit:
+                self.db.commit()
 
     def count_frames_by_image(self, image_id: int) -> int:
         return self.db.query(func.count(self.model.id)).filter(
             self.model.image_id == image_id
         ).scalar()
 
-    def delete_by_image(self, image_id: int) -> int:
-        count = self.db.query(self.model).filter(
-            self.model.image_id == image_id
-        ).delete()
-        self.db.commit()
+    def delete_by_image(self, image_id: int, commit: bool = True) -> Optional[int]:
+        """
+        Remove all frames of an image, by dropping its partition when it has one.
+
+        Returns the number of deleted rows, or None when a partition was dropped.
+        """
+        mark_image_dirty(self.db, image_id)
+        if self.drop_partition(image_id):
+            count = None
+        else:
+            count = self.db.query(self.model).filter(
+                self.model.image_id == image_id
+            ).delete(synchronize_session=False)
+
+        if commit:
+            self.db.commit()
         return count
 
+    @property
+    def is_partitioned(self) -> bool:
+        """
+        Whether image_frames is list-partitioned by image_id (Postgres with the partitioning migration applied).
+        """
+        if not self.is_postgres:
+            return False
+        if ImageFrameRepository._partitioned is None:
+            ImageFrameRepository._partitioned = self.db.execute(text(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:table))"
+            ), {'table': self.model.__tablename__}).scalar()
+        return ImageFrameRepository._partitioned
+
+    def partition_name(self, image_id: int) -> str:
+        return f"{self.model.__tablename__}_p{int(image_id)}"
+
+    def create_staging_partition(self, image_id: int) -> Optional[str]:
+        """
+        Create an unattached, index-free table for an image's frames and return its name.
+
+        Returns None when frames are not partitioned; callers then insert into image_frames directly.
+        """
+        if not self.is_partitioned:
+            return None
+
+        name = self.partition_name(image_id)
+        self.db.execute(text(f"CREATE TABLE {name} (LIKE {self.model.__tablename__} INCLUDING DEFAULTS)"))
+        # The matching CHECK lets ATTACH PARTITION skip its validation scan.
+        self.db.execute(text(f"ALTER TABLE {name} ADD CONSTRAINT {name}_bound CHECK (image_id = {int(image_id)})"))
+        return name
+
+    def attach_staging_partition(self, image_id: int) -> None:
+        """
+        Attach a loaded staging table as the image's partition; Postgres builds its indexes in one pass.
+        """
+        name = self.partition_name(image_id)
+        self.db.execute(text(
+            f"ALTER TABLE {self.model.__tablename__} ATTACH PARTITION {name} FOR VALUES IN ({int(image_id)})"
+        ))
+        self.db.execute(text(f"ALTER TABLE {name} DROP CONSTRAINT {name}_bound"))
+
+    def drop_partition(self, image_id: int) -> bool:
+        if not self.is_partitioned:
+            return False
+
+        name = self.partition_name(image_id)
+        if self.db.execute(text("SELECT to_regclass(:name)"), {'name': name}).scalar() is None:
+            return False
+        self.db.execute(text(f"DROP TABLE {name}"))
+        return True
+
     def create_frame(self, image_id: int, depth: float, pixels: list) -> ImageFrame:
         return self.create(
             image_id=image_id,
             depth=depth,
-            pixels=pixels
+            width=len(pixels),
+            pixels=PixelCodec.pack(pixels)
         )
 
     def bulk_insert(self, mappings: List[dict]) -> None:
         self.db.bulk_insert_mappings(ImageFrame, mappings)
-        self.db.commit()
\ No newline at end of file
+        self.db.commit()
+
+    def bulk_insert_frames(
+        self,
+        image_id: int,
+        depths: np.ndarray,
+        pixels: np.ndarray,
+        commit: bool = True,
+        table: Optional[str] = None
+    ) -> None:
+        if len(depths) == 0:
+            return
+
+        mark_image_dirty(self.db, image_id)
+        if self.is_postgres:
+            self.copy_frames(image_id, depths, pixels, table)
+        else:
+            width = pixels.shape[1]
+            self.db.bulk_insert_mappings(ImageFrame, [
+                {
+                    'image_id': image_id,
+                    'depth': float(depth),
+                    'width': width,
+                    'pixels': row.tobytes()
+                }
+                for depth, row in zip(depths, pixels)
+            ])
+
+        if commit:
+            self.db.commit()
+
+    def copy_frames(
+        self,
+        image_id: int,
+        depths: np.ndarray,
+        pixels: np.ndarray,
+        table: Optional[str] = None
+    ) -> None:
+        width = pixels.shape[1]
+        self.copy_binary([
+            ('image_id', '>i4', image_id),
+            ('depth', '>f8', depths),
+            ('width', '>i4', width),
+            ('pixels', ('u1', (width,)), pixels),
+        ], len(depths), table)
@@ -1,9 +1,12 @@
 from typing import Optional
 from sqlalchemy.orm import Session
 from fastapi import Depends
+from src.cache import mark_image_dirty
 from src.database import get_db
 from src.models import Image
 from src.repositories.base_repository import BaseRepository
+from src.repositories.image_frame_repository import ImageFrameRepository
+from src.utils.fingerprint import SourceFingerprint
 
 
 class ImageRepository(BaseRepository[Image]):
@@ -11,15 +14,77 @@ class ImageRepository(BaseRepository[Image]):
     def __init__(self, db: Session = Depends(get_db)):
         super().__init__(db, Image)
 
-    def create_image(self, target_width: int, csv_source: str = None) -> Image:
+    def create_image(self, target_width: int, csv_source: str = None, derived_from_id: Optional[int] = None) -> Image:
         return self.create(
             target_width=target_width,
             csv_source=csv_source,
+            derived_from_id=derived_from_id,
             total_frames=0
         )
 
-    def update_frame_count(self, image_id: int, total_frames: int) -> Optional[Image]:
-        return self.update(image_id, total_frames=total_frames)
+    def update_frame_count(
+        self,
+        image_id: int,
+        total_frames: int,
+        fingerprint: Optional[SourceFingerprint] = None
+    ) -> Optional[Image]:
+        if fingerprint is None:
+            return self.update(image_id, total_frames=total_frames)
+        return self.update(image_id, total_frames=total_frames, **fingerprint.columns())
+
+    def update_source_mtime(self, image_id: int, mtime: float) -> None:
+        # Metadata only; cached frames and metadata stay valid, so the image is not marked dirty.
+        self.db.query(Image).filter(Image.id == image_id).update({Image.source_mtime: mtime})
+        self.db.commit()
+
+    def get_by_fingerprint(self, source_hash: str, target_width: int) -> Optional[Image]:
+        return self.db.query(Image).filter(
+            Image.source_hash == source_hash,
+            Image.target_width == target_width
+        ).order_by(Image.id.desc()).first()
+
+    def get_derived(self, base_id: int, target_width: int, total_frames: int) -> Optional[Image]:
+        """
+        Completed derivation of the base image at this width.
+
+        Matching the base's frame count skips derivations still in progress and
+        those made before frames were appended to the base.
+        """
+        return self.db.query(Image).filter(
+            Image.derived_from_id == base_id,
+            Image.target_width == target_width,
+            Image.total_frames == total_frames
+        ).order_by(Image.id.desc()).first()
+
+    def get_latest_by_source(self, csv_source: str, target_width: int) -> Optional[Image]:
+        """
+        Latest completed ingest of the source path at this width.
+        """
+        return self.db.query(Image).filter(
+            Image.csv_source == csv_source,
+            Image.target_width == target_width,
+            Image.source_hash.isnot(None)
+        ).order_by(Image.id.desc()).first()
 
     def get_by_id(self, image_id: int) -> Optional[Image]:
-        return super().get_by_id(image_id)
\ No newline at end of file
+        return super().get_by_id(image_id)
+
+    def update(self, image_id: int, **kwargs) -> Optional[Image]:
+        mark_image_dirty(self.db, image_id)
+        return super().update(image_id, **kwargs)
+
+    def delete(self, image_id: int) -> bool:
+        """
+        Delete the image and its frames in one transaction.
+
+        Frames go first through ImageFrameRepository.delete_by_image, which drops the image's
+        partition instead of leaving it empty behind a row-by-row cascade.
+        """
+        image = self.get_by_id(image_id)
+        if image is None:
+            return False
+
+        ImageFrameRepository(self.db).delete_by_image(image_id, commit=False)
+        self.db.delete(image)
+        self.db.commit()
+        return True
\ No newline at end of file
@@ -1,6 +1,19 @@
 from .image_processor import ImageProcessor
+from .job_manager import Job, JobManager, JobStatus, JobCancelledError, job_manager
+from .pyramid_builder import PyramidBuilder
+from .frame_sources import (
+    FrameSource, CsvSource, ParquetSource, NpySource, RawSource, SourceFormat, RECORD_DTYPE, open_source
+)
+from .parallel_ingest import ParallelCsvReader
 from .data_loader import DataLoader
+from .colormap_pipeline import ColormapPipeline
 from .colormap_processor import ColorMapProcessor
 from .frame_service import FrameService
+from .image_renderer import ImageRenderer, RenderFormat
 
-__all__ = ["ImageProcessor", "DataLoader", "ColorMapProcessor", "FrameService"]
\ No newline at end of file
+__all__ = [
+    "ImageProcessor", "PyramidBuilder", "ParallelCsvReader", "DataLoader", "ColorMapProcessor", "ColormapPipeline", "FrameService",
+    "ImageRenderer", "RenderFormat",
+    "FrameSource", "CsvSource", "ParquetSource", "NpySource", "RawSource", "SourceFormat", "RECORD_DTYPE", "open_source",
+    "Job", "JobManager", "JobStatus", "JobCancelledError", "job_manager"
+]
\ No newline at end of file
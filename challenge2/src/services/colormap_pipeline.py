@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional
+from src.config import settings
+from src.database import BulkSessionLocal
+from src.metrics import colormap_batch_seconds
+from src.models import ColormapJob
+from src.repositories import ImageFrameRepository, ColormapJobRepository
+from src.services.job_manager import Job
+from src.utils.colormap import ColormapHandler
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+READ_SECONDS = colormap_batch_seconds.labels(stage="read")
+COMPUTE_SECONDS = colormap_batch_seconds.labels(stage="compute")
+UPDATE_SECONDS = colormap_batch_seconds.labels(stage="update")
+
+
+class ColormapPipeline:
+    """
+    Overlap frame reads, colormap computation and writes for one colormap job.
+
+    A reader thread streams pixel batches on its own session and hands them
+    to a compute pool; the calling thread writes the results back in read
+    order, so checkpoints stay monotonic. The bounded queue between the
+    stages caps how many batches are in flight.
+    """
+
+    def __init__(
+        self,
+        frame_repository: ImageFrameRepository,
+        job_repository: ColormapJobRepository,
+        colormap_job: ColormapJob,
+        job: Optional[Job] = None,
+        workers: Optional[int] = None,
+        queue_depth: Optional[int] = None
+    ):
+        self.frame_repository = frame_repository
+        self.job_repository = job_repository
+        self.job = job
+        self.colormap_job_id = colormap_job.id
+        self.image_id = colormap_job.image_id
+        self.colormap_name = colormap_job.colormap_name
+        self.batch_size = colormap_job.batch_size
+        self.total = colormap_job.total
+        self.last_frame_id = colormap_job.last_frame_id
+        self.processed = colormap_job.processed
+        self.workers = workers or settings.colormap_workers
+        self.pending: queue.Queue = queue.Queue(maxsize=queue_depth or settings.colormap_queue_depth)
+        self._stop = threading.Event()
+
+    def run(self) -> None:
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="colormap") as pool:
+            reader = threading.Thread(
+                target=self._read,
+                args=(pool,),
+                name=f"colormap-reader-{self.colormap_job_id}",
+                daemon=True
+            )
+            reader.start()
+            try:
+                self._write()
+            finally:
+                self._stop.set()
+                reader.join()
+
+    def _read(self, pool: ThreadPoolExecutor) -> None:
+        db = BulkSessionLocal()
+        outcome = _DONE
+        try:
+            reader = ImageFrameRepository(db)
+            after_id = self.last_frame_id
+            while not self._stop.is_set():
+                with READ_SECONDS.time():
+                    frames = reader.get_frames_batch(
+                        self.image_id, after_id, self.batch_size,
+                        include_pixels=True, skip_colormap=self.colormap_name
+                    )
+                    # End the read transaction so the reader never pins an old snapshot.
+                    db.rollback()
+                if not frames:
+                    break
+
+                after_id = frames[-1].id
+                future = pool.submit(
+                    self._compute,
+                    ImageFrameRepository.pixels_matrix(frames),
+                    self.colormap_name
+                )
+                self._put(([frame.id for frame in frames], future))
+        except Exception as e:
+            outcome = e
+        finally:
+            db.close()
+            self._put(outcome)
+
+    @staticmethod
+    def _compute(matrix, colormap_name: str):
+        with COMPUTE_SECONDS.time():
+            return ColormapHandler.apply_colormap_batch(matrix, colormap_name)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self.pending.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _write(self) -> None:
+        batch_num = 0
+        while True:
+            item = self.pending.get()
+            if item is _DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+
+            if self.job:
+                self.job.check_cancelled()
+
+            frame_ids, future = item
+            rgb_matrix = future.result()
+            batch_num += 1
+
+            with UPDATE_SECONDS.time():
+                self.frame_repository.update_colormap_batch(
+                    self.image_id,
+                    [{'id': frame_id, 'color_map_pixels': rgb} for frame_id, rgb in zip(frame_ids, rgb_matrix)],
+                    self.colormap_name,
+                    datetime.now(timezone.utc),
+                    commit=False
+                )
+                self.last_frame_id = frame_ids[-1]
+                self.processed += len(frame_ids)
+
+                # Frame updates and the checkpoint are committed together.
+                self.job_repository.checkpoint(self.colormap_job_id, self.last_frame_id, self.processed)
+            if self.job:
+                self.job.image_id = self.image_id
+                self.job.report_progress(self.processed)
+
+            logger.info(
+                f"Batch {batch_num} committed: {self.processed}/{self.total} frames processed"
+            )
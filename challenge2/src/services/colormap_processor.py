@@ -1,9 +1,13 @@
 import logging
-from typing import Dict
-from datetime import datetime, timezone
+from typing import Dict, Optional
+from datetime import datetime, timedelta, timezone
 from fastapi import Depends, HTTPException
-from src.utils.colormap import ColormapHandler
-from src.repositories import ImageFrameRepository, ImageRepository
+from src.config import settings
+from src.database import BulkSessionLocal, SessionLocal
+from src.models import ColormapJob, ColormapJobStatus
+from src.repositories import ImageFrameRepository, ImageRepository, ColormapJobRepository
+from src.services.colormap_pipeline import ColormapPipeline
+from src.services.job_manager import Job, JobCancelledError, job_manager
 
 logger = logging.getLogger(__name__)
 
@@ -13,82 +17,144 @@ class ColorMapProcessor:
     def __init__(
         self,
         frame_repository: ImageFrameRepository = Depends(),
-        image_repository: ImageRepository = Depends()
+        image_repository: ImageRepository = Depends(),
+        job_repository: ColormapJobRepository = Depends()
     ):
         self.frame_repository = frame_repository
         self.image_repository = image_repository
+        self.job_repository = job_repository
 
-    def apply_colormap_to_image(
+    def start_colormap_job(
         self,
         image_id: int,
         colormap_name: str,
         batch_size: int = 100
-    ) -> Dict:
+    ) -> ColormapJob:
         image = self.image_repository.get_by_id(image_id)
         if not image:
             raise HTTPException(status_code=404, detail=f"Image {image_id} not found")
-        total_frames = self.frame_repository.count_frames_by_image(image_id)
-        if total_frames == 0:
-            raise ValueError(f"No frames found for image {image_id}")
-
-        total_batches = (total_frames + batch_size - 1) // batch_size
-
-        logger.info(
-            f"Starting colormap '{colormap_name}' application for image {image_id}: "
-            f"{total_frames} frames in {total_batches} batches"
-        )
 
-        offset = 0
-        batch_num = 0
-        processed = 0
+        active_job = self.job_repository.get_active_for_image(image_id)
+        if active_job:
+            raise HTTPException(
+                status_code=409,
+                detail=f"Colormap job {active_job.id} is already {active_job.status} for image {image_id}"
+            )
 
-        while offset < total_frames:
-            batch_num += 1
+        if self.frame_repository.count_frames_by_image(image_id) == 0:
+            raise ValueError(f"No frames found for image {image_id}")
 
-            frames = self.frame_repository.get_frames_batch(
-                image_id, offset, batch_size, include_pixels=True
+        previous_job = self.job_repository.get_latest(image_id, colormap_name)
+        remaining = self.frame_repository.count_frames_needing_colormap(image_id, colormap_name)
+        if previous_job and previous_job.status == ColormapJobStatus.failed.value:
+            # Reuse the failed run, but rescan from the first frame: another colormap job may have
+            # overwritten frames below its checkpoint since. Frames already done are skipped by the read.
+            total_frames = self.frame_repository.count_frames_by_image(image_id)
+            colormap_job = self.job_repository.update(
+                previous_job.id,
+                status=ColormapJobStatus.pending.value,
+                batch_size=batch_size,
+                last_frame_id=0,
+                processed=total_frames - remaining,
+                total=total_frames,
+                error=None,
+                finished_at=None
             )
-
-            logger.info(
-                f"Processing batch {batch_num}/{total_batches}: {len(frames)} frames"
+        else:
+            colormap_job = self.job_repository.create_job(image_id, colormap_name, batch_size, remaining)
+
+        self.submit(colormap_job.id)
+        return colormap_job
+
+    def get_colormap_job(self, job_id: int) -> ColormapJob:
+        colormap_job = self.job_repository.get_by_id(job_id)
+        if not colormap_job:
+            raise HTTPException(status_code=404, detail=f"Colormap job {job_id} not found")
+        return colormap_job
+
+    @staticmethod
+    def submit(colormap_job_id: int) -> Job:
+        return job_manager.submit("colormap", ColorMapProcessor.run_job, colormap_job_id=colormap_job_id)
+
+    @staticmethod
+    def submit_later(colormap_job_id: int, delay: float) -> None:
+        job_manager.submit_later(delay, "colormap", ColorMapProcessor.run_job, colormap_job_id=colormap_job_id)
+
+    @staticmethod
+    def run_job(job: Job, colormap_job_id: int) -> None:
+        db = BulkSessionLocal()
+        try:
+            processor = ColorMapProcessor(
+                ImageFrameRepository(db),
+                ImageRepository(db),
+                ColormapJobRepository(db)
             )
-
-            frame_updates = []
-            current_timestamp = datetime.now(timezone.utc)
-
-            for frame in frames:
-                try:
-                    if frame.pixels:
-                        rgb_pixels = ColormapHandler.apply_colormap(
-                            frame.pixels,
-                            colormap_name
-                        )
-
-                        frame_updates.append({
-                            'id': frame.id,
-                            'color_map_pixels': rgb_pixels
-                        })
-
-                        processed += 1
-
-                except Exception as e:
-                    logger.error(f"Error applying colormap to frame {frame.id}: {e}")
-
-            if frame_updates:
-                self.frame_repository.update_colormap_batch(
-                    frame_updates, colormap_name, current_timestamp
-                )
-
+            processor.apply_colormap_to_image(colormap_job_id, job=job)
+        finally:
+            db.close()
+
+    @staticmethod
+    def resume_pending_jobs() -> int:
+        db = SessionLocal()
+        try:
+            resumable = ColormapJobRepository(db).get_resumable()
+        finally:
+            db.close()
+
+        for colormap_job in resumable:
             logger.info(
-                f"Batch {batch_num} committed: {processed}/{total_frames} frames processed"
+                f"Resuming colormap job {colormap_job.id} for image {colormap_job.image_id} "
+                f"after frame {colormap_job.last_frame_id}"
             )
+            ColorMapProcessor.submit(colormap_job.id)
+
+        return len(resumable)
+
+    def apply_colormap_to_image(self, colormap_job_id: int, job: Optional[Job] = None) -> Dict:
+        stale_after = timedelta(seconds=settings.colormap_job_stale_seconds)
+        now = datetime.now(timezone.utc)
+        if not self.job_repository.claim(colormap_job_id, now - stale_after):
+            colormap_job = self.job_repository.get_by_id(colormap_job_id)
+            if colormap_job is None or colormap_job.status != ColormapJobStatus.running.value:
+                logger.info(f"Colormap job {colormap_job_id} is not claimable, skipping")
+                return {}
+
+            # Still running under a recent checkpoint: either another worker is on it, or its
+            # process crashed and was restarted. Try again once the checkpoint goes stale.
+            updated_at = colormap_job.updated_at
+            if updated_at.tzinfo is None:
+                updated_at = updated_at.replace(tzinfo=timezone.utc)
+            retry_in = max((updated_at + stale_after - now).total_seconds(), 1.0)
+            logger.info(f"Colormap job {colormap_job_id} is running elsewhere, retrying claim in {retry_in:.0f}s")
+            ColorMapProcessor.submit_later(colormap_job_id, retry_in)
+            return {}
+
+        colormap_job = self.job_repository.get_by_id(colormap_job_id)
+        pipeline = ColormapPipeline(self.frame_repository, self.job_repository, colormap_job, job=job)
 
-            offset += batch_size
+        logger.info(
+            f"Starting colormap '{pipeline.colormap_name}' application for image {pipeline.image_id}: "
+            f"{pipeline.total - pipeline.processed} frames remaining, resuming after frame "
+            f"{pipeline.last_frame_id} with {pipeline.workers} workers"
+        )
 
-        logger.info(f"Colormap application completed: {processed} frames processed")
+        try:
+            pipeline.run()
+        except JobCancelledError:
+            self.job_repository.rollback()
+            self.job_repository.set_status(colormap_job_id, ColormapJobStatus.pending)
+            logger.info(f"Colormap job {colormap_job_id} interrupted after frame {pipeline.last_frame_id}")
+            raise
+        except Exception as e:
+            self.job_repository.rollback()
+            self.job_repository.set_status(colormap_job_id, ColormapJobStatus.failed, error=str(e))
+            raise
+
+        self.job_repository.set_status(colormap_job_id, ColormapJobStatus.completed)
+        logger.info(f"Colormap application completed: {pipeline.processed} frames processed")
 
         return {
-            'processed': processed,
-            'total': total_frames,
-            'colormap': colormap_name
-        }
\ No newline at end of file
+            'processed': pipeline.processed,
+            'total': pipeline.total,
+            'colormap': pipeline.colormap_name
+        }
@@ -1,90 +1,395 @@
-import pandas as pd
 import numpy as np
-from typing import  Dict, Tuple
+import os
+import threading
+import time
+from contextlib import closing
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 import logging
 from fastapi import Depends
-from src.models import ImageFrame
+from src.config import settings
+from src.database import BulkSessionLocal
+from src.metrics import ingest_batch_seconds
+from src.services.job_manager import Job
+from src.services.frame_sources import FrameSource, SourceFormat
 from src.services.image_processor import ImageProcessor
-from src.repositories import ImageFrameRepository, ImageRepository
+from src.services.parallel_ingest import ParallelCsvReader
+from src.services.pyramid_builder import PyramidBuilder
+from src.models import Image
+from src.repositories import ImageFrameRepository, ImageFrameLevelRepository, ImageRepository
+from src.utils.fingerprint import SourceFingerprint
 
 logger = logging.getLogger(__name__)
 
+PARSE_SECONDS = ingest_batch_seconds.labels(stage="parse")
+RESIZE_SECONDS = ingest_batch_seconds.labels(stage="resize")
+INSERT_SECONDS = ingest_batch_seconds.labels(stage="insert")
+
 
 class DataLoader:
+    _source_locks: Dict[Tuple[str, int], threading.Lock] = {}
+    _source_locks_guard = threading.Lock()
+
     def __init__(
         self,
         frame_repository: ImageFrameRepository = Depends(),
-        image_repository: ImageRepository = Depends()
+        image_repository: ImageRepository = Depends(),
+        level_repository: ImageFrameLevelRepository = Depends()
     ):
         self.frame_repository = frame_repository
         self.image_repository = image_repository
         self.image_processor = ImageProcessor()
+        self.pyramid_builder = PyramidBuilder(frame_repository, level_repository, image_repository)
+
+    @staticmethod
+    def run_job(job: Job, source: FrameSource, target_width: int, workers: int = 1, ordered: bool = True) -> None:
+        db = BulkSessionLocal()
+        try:
+            data_loader = DataLoader(ImageFrameRepository(db), ImageRepository(db), ImageFrameLevelRepository(db))
+            data_loader.load_resize_and_save(source, target_width, job=job, workers=workers, ordered=ordered)
+        finally:
+            db.close()
+
+    @staticmethod
+    def run_derive_job(job: Job, image_id: int, target_width: int) -> None:
+        db = BulkSessionLocal()
+        try:
+            data_loader = DataLoader(ImageFrameRepository(db), ImageRepository(db), ImageFrameLevelRepository(db))
+            data_loader.derive_width(image_id, target_width, job=job)
+        finally:
+            db.close()
+
+    def load_resize_and_save(
+        self,
+        source: FrameSource,
+        target_width: int = 150,
+        job: Optional[Job] = None,
+        workers: int = 1,
+        ordered: bool = True
+    ) -> Tuple[int, int]:
+        """
+        Ingest a source unless an image of the same content and width exists.
+
+        A source that only grew since its last ingest has just its new rows appended to that image.
+        """
+        # Concurrent requests for one source wait here, so the second finds the first's image.
+        with self.source_lock(source.path, target_width):
+            previous = self.image_repository.get_latest_by_source(source.path, target_width)
+            stat = os.stat(source.path)
+            if previous and (previous.source_size, previous.source_mtime) == (stat.st_size, stat.st_mtime):
+                # Same size and modification time as the last ingest: trusted without rehashing, like make or rsync.
+                return self.reuse_image(previous, job)
+
+            prefix_size = previous.source_size if previous and 0 < previous.source_size < stat.st_size else None
+            fingerprint = SourceFingerprint.compute(source.path, prefix_size)
+
+            existing = self.image_repository.get_by_fingerprint(fingerprint.sha256, target_width)
+            if existing:
+                if existing.csv_source == source.path:
+                    self.image_repository.update_source_mtime(existing.id, fingerprint.mtime)
+                return self.reuse_image(existing, job)
 
-    def load_resize_and_save(self, csv_path: str, target_width: int = 150) -> Tuple[int, int]:
+            if fingerprint.prefix_sha256 is not None and fingerprint.prefix_sha256 == previous.source_hash:
+                tail = source.tail(prefix_size)
+                if tail is not None:
+                    return self.append_frames(previous, tail, fingerprint, job, workers, ordered)
+
+            return self.create_image(source, target_width, fingerprint, job, workers, ordered)
+
+    def create_image(
+        self,
+        source: FrameSource,
+        target_width: int,
+        fingerprint: SourceFingerprint,
+        job: Optional[Job] = None,
+        workers: int = 1,
+        ordered: bool = True
+    ) -> Tuple[int, int]:
         image = self.image_repository.create_image(
             target_width=target_width,
-            csv_source=csv_path
+            csv_source=source.path
         )
         image_id = image.id
         logger.info(f"Created new image record with ID: {image_id}")
+        if job:
+            job.image_id = image_id
+            job.ingest_mode = "created"
+
+        frames_processed = self.populate_image(
+            image_id,
+            lambda table: self.write_frames(image_id, source, target_width, job, workers, ordered, table),
+            fingerprint
+        )
+        return image_id, frames_processed
+
+    def derive_width(self, base_id: int, target_width: int, job: Optional[Job] = None) -> Tuple[int, int]:
+        """
+        Create an image at another width by resampling the stored frames of `base_id`, without reading its source.
+        """
+        with self.source_lock(f"image:{base_id}", target_width):
+            base = self.image_repository.get_by_id(base_id)
+            if base is None:
+                raise ValueError(f"Image {base_id} not found")
+            if base.target_width == target_width:
+                return self.reuse_image(base, job)
+
+            existing = self.image_repository.get_derived(base_id, target_width, base.total_frames)
+            if existing:
+                return self.reuse_image(existing, job)
+
+            image = self.image_repository.create_image(
+                target_width=target_width,
+                csv_source=base.csv_source,
+                derived_from_id=base_id
+            )
+            image_id = image.id
+            logger.info(f"Deriving image {image_id} at width {target_width} from image {base_id}")
+            if job:
+                job.image_id = image_id
+                job.ingest_mode = "derived"
+
+            frames_processed = self.populate_image(
+                image_id,
+                lambda table: self.write_resampled_frames(base_id, image_id, target_width, job, table)
+            )
+            return image_id, frames_processed
+
+    def populate_image(
+        self,
+        image_id: int,
+        write: Callable[[Optional[str]], int],
+        fingerprint: Optional[SourceFingerprint] = None
+    ) -> int:
+        """
+        Fill a new image through `write` and commit it, or delete the image if anything fails.
+        """
+        try:
+            # On a partitioned table, frames are loaded into a bare staging table and attached at the end.
+            staging_table = self.frame_repository.create_staging_partition(image_id)
+            frames_processed = write(staging_table)
+
+            if staging_table is not None:
+                self.frame_repository.attach_staging_partition(image_id)
+
+            # Commits the frames, the final count and the fingerprint in the same transaction.
+            self.image_repository.update_frame_count(image_id, frames_processed, fingerprint)
+        except Exception:
+            self.frame_repository.rollback()
+            self.image_repository.delete(image_id)
+            raise
 
-        frames_processed = 0
-        batch_data = []
-        batch_size = 5000
-
-        for chunk in pd.read_csv(csv_path, chunksize=10000):
-            chunk = chunk.dropna().reset_index(drop=True)
-            chunk = chunk[np.isfinite(chunk.iloc[:, 0])]
-
-            for row in chunk.itertuples(index=False):
-                frame_data = self.parse_and_resize_row(row, target_width)
-                if frame_data:
-                    batch_data.append({
-                        "image_id": image_id,
-                        **frame_data
-                    })
-                    frames_processed += 1
-
-                    if len(batch_data) >= batch_size:
-                        self.frame_repository.bulk_insert(batch_data)
-                        batch_data = []
-                        logger.info(f"Processed batch: {frames_processed} frames")
-
-        if batch_data:
-            self.frame_repository.bulk_insert(batch_data)
-
-        self.image_repository.update_frame_count(image_id, frames_processed)
         logger.info(f"Successfully processed {frames_processed} frames for image {image_id}")
+        self.build_pyramid(image_id, frames_processed)
 
-        return image_id, frames_processed
+        return frames_processed
+
+    def append_frames(
+        self,
+        image: Image,
+        tail: FrameSource,
+        fingerprint: SourceFingerprint,
+        job: Optional[Job] = None,
+        workers: int = 1,
+        ordered: bool = True
+    ) -> Tuple[int, int]:
+        image_id = image.id
+        logger.info(f"Source of image {image_id} grew from {image.source_size} to {fingerprint.size} bytes, appending")
+        if job:
+            job.image_id = image_id
+            job.ingest_mode = "appended"
 
-    def parse_and_resize_row(self, row, target_width: int) -> Dict:
         try:
-            depth = float(row[0])
+            appended = self.write_frames(image_id, tail, image.target_width, job, workers, ordered)
+            total_frames = image.total_frames + appended
+            self.image_repository.update_frame_count(image_id, total_frames, fingerprint)
+        except Exception:
+            # Only the new rows are rolled back; the image keeps its previous frames and fingerprint.
+            self.frame_repository.rollback()
+            raise
+
+        logger.info(f"Appended {appended} frames to image {image_id}")
+        self.build_pyramid(image_id, total_frames)
+
+        return image_id, total_frames
+
+    def reuse_image(self, image: Image, job: Optional[Job] = None) -> Tuple[int, int]:
+        logger.info(f"Reusing image {image.id} of {image.csv_source} at width {image.target_width}")
+        if job:
+            job.image_id = image.id
+            job.ingest_mode = "reused"
+        return image.id, image.total_frames
+
+    def write_frames(
+        self,
+        image_id: int,
+        source: FrameSource,
+        target_width: int,
+        job: Optional[Job] = None,
+        workers: int = 1,
+        ordered: bool = True,
+        table: Optional[str] = None
+    ) -> int:
+        """
+        Read, resize and insert every row of `source` without committing; returns the frame count.
+        """
+        frames_processed = 0
+        pending_depths = []
+        pending_pixels = []
+        pending_rows = 0
+
+        # Binary sources are not parsed at all, so only CSV gains from a process pool.
+        if workers > 1 and source.format == SourceFormat.csv:
+            reader = ParallelCsvReader(workers, settings.ingest_range_bytes, ordered)
+            blocks = self.read_parallel(reader, source, target_width, job)
+        else:
+            blocks = self.read_sequential(source, target_width, job)
+
+        # Closing the reader on failure cancels ranges still queued in the process pool.
+        with closing(blocks):
+            for depths, pixels, rows_read in blocks:
+                if job:
+                    job.report_progress(frames_processed + pending_rows + len(depths), rows_read - len(depths))
+                if len(depths) == 0:
+                    continue
 
-            if pd.isna(depth) or np.isinf(depth):
-                return None
+                pending_depths.append(depths)
+                pending_pixels.append(pixels)
+                pending_rows += len(depths)
 
-            original_pixels = np.array(row[1:201], dtype=np.float64)
+                if pending_rows >= settings.ingest_flush_rows:
+                    self.flush_frames(image_id, pending_depths, pending_pixels, table)
+                    frames_processed += pending_rows
+                    pending_depths, pending_pixels, pending_rows = [], [], 0
+                    logger.info(f"Processed batch: {frames_processed} frames")
 
-            if np.isnan(original_pixels).any():
-                return None
+        if pending_rows:
+            self.flush_frames(image_id, pending_depths, pending_pixels, table)
+            frames_processed += pending_rows
 
-            if len(original_pixels) != 200:
-                return None
+        return frames_processed
+
+    def write_resampled_frames(
+        self,
+        base_id: int,
+        image_id: int,
+        target_width: int,
+        job: Optional[Job] = None,
+        table: Optional[str] = None
+    ) -> int:
+        frames_processed = 0
+        blocks = self.frame_repository.iter_depth_blocks(base_id, chunk_size=settings.ingest_flush_rows)
 
-            original_pixels = original_pixels.astype(np.int32)
+        with closing(blocks):
+            for depths, pixels in blocks:
+                if job:
+                    job.check_cancelled()
 
-            if not ((original_pixels >= 0) & (original_pixels <= 255)).all():
-                return None
+                started = time.perf_counter()
+                with RESIZE_SECONDS.time():
+                    pixels = ImageProcessor.resample_width(pixels, target_width)
+                self.flush_frames(image_id, [depths], [pixels], table)
+                frames_processed += len(depths)
 
-            resized_pixels = self.image_processor.resize_image_row(original_pixels.tolist(), target_width)
+                if job:
+                    job.report_worker("main", len(depths), time.perf_counter() - started)
+                    job.report_progress(frames_processed)
+                logger.info(f"Resampled batch: {frames_processed} frames")
 
-            return {
-                'depth': depth,
-                'pixels': resized_pixels
-            }
+        return frames_processed
 
+    def build_pyramid(self, image_id: int, total_frames: int) -> None:
+        try:
+            self.pyramid_builder.build(image_id, total_frames)
         except Exception as e:
-            logger.error(f"Error parsing row: {e}")
-            return None
\ No newline at end of file
+            # The image stays readable at full resolution without a pyramid.
+            self.frame_repository.rollback()
+            logger.error(f"Failed to build depth pyramid for image {image_id}: {e}")
+
+    @classmethod
+    def source_lock(cls, path: str, target_width: int) -> threading.Lock:
+        with cls._source_locks_guard:
+            return cls._source_locks.setdefault((path, target_width), threading.Lock())
+
+    def read_sequential(
+        self,
+        source: FrameSource,
+        target_width: int,
+        job: Optional[Job] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, int]]:
+        blocks = source.blocks(settings.ingest_chunk_rows)
+        while True:
+            if job:
+                job.check_cancelled()
+
+            # Timed from the read so a worker's throughput includes parsing the source.
+            started = time.perf_counter()
+            block = next(blocks, None)
+            if block is None:
+                return
+
+            rows = len(block[0])
+            depths, pixels = self.validate_block(*block)
+            parsed = time.perf_counter()
+            pixels = self.resize_block(pixels, target_width)
+            PARSE_SECONDS.observe(parsed - started)
+            RESIZE_SECONDS.observe(time.perf_counter() - parsed)
+            if job:
+                job.report_worker("main", rows, time.perf_counter() - started)
+            yield depths, pixels, rows
+
+    @staticmethod
+    def read_parallel(
+        reader: ParallelCsvReader,
+        source: FrameSource,
+        target_width: int,
+        job: Optional[Job] = None
+    ) -> Iterator[Tuple[np.ndarray, np.ndarray, int]]:
+        for result in reader.read(source.path, target_width, job, start=source.start):
+            # Workers time their own stages; their metrics registries are not the one /metrics serves.
+            PARSE_SECONDS.observe(result.parse_seconds)
+            RESIZE_SECONDS.observe(result.resize_seconds)
+            if job:
+                job.report_worker(result.worker, result.rows_read, result.seconds)
+            yield result.depths, result.pixels, result.rows_read
+
+    def flush_frames(
+        self,
+        image_id: int,
+        depths: List[np.ndarray],
+        pixels: List[np.ndarray],
+        table: Optional[str] = None
+    ) -> None:
+        with INSERT_SECONDS.time():
+            self.frame_repository.bulk_insert_frames(
+                image_id,
+                np.concatenate(depths),
+                np.concatenate(pixels),
+                commit=False,
+                table=table
+            )
+
+    @staticmethod
+    def validate_and_resize(depths: np.ndarray, pixels: np.ndarray, target_width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Validate a source block as one matrix and resize all valid rows at once.
+
+        Returns:
+            Tuple of (depths, pixels) with shapes (N,) and (N, target_width).
+        """
+        depths, pixels = DataLoader.validate_block(depths, pixels)
+        return depths, DataLoader.resize_block(pixels, target_width)
+
+    @staticmethod
+    def validate_block(depths: np.ndarray, pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = len(depths)
+        depths, pixels = FrameSource.validate(depths, pixels)
+
+        dropped = rows - len(depths)
+        if dropped:
+            logger.warning(f"Dropped {dropped} invalid rows from chunk")
+        return depths, pixels
+
+    @staticmethod
+    def resize_block(pixels: np.ndarray, target_width: int) -> np.ndarray:
+        if len(pixels) == 0:
+            return np.empty((0, target_width), dtype=np.uint8)
+        return ImageProcessor.resize_image_block(pixels, target_width)
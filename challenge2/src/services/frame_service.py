@@ -1,8 +1,14 @@
-from typing import Tuple, List, Optional
+from typing import AsyncIterator, Tuple, Optional
 import logging
 from fastapi import Depends, HTTPException
-from src.repositories import ImageFrameRepository, ImageRepository
+from starlette.concurrency import run_in_threadpool
+from src.repositories import AsyncImageFrameRepository, AsyncImageRepository
 from src.models import ImageFrame, Image
+from src.utils.cursor import FrameCursor
+from src.cache import FrameBlock, frame_block_cache, frame_count_cache, replica_freshness, shared_cache
+from src.database import route_reads_to_primary
+from src.services.image_processor import ImageProcessor
+from src.services.pyramid_builder import PyramidBuilder
 
 logger = logging.getLogger(__name__)
 
@@ -11,42 +17,183 @@ class FrameService:
 
     def __init__(
         self,
-        frame_repository: ImageFrameRepository = Depends(),
-        image_repository: ImageRepository = Depends()
+        frame_repository: AsyncImageFrameRepository = Depends(),
+        image_repository: AsyncImageRepository = Depends()
     ):
         self.frame_repository = frame_repository
         self.image_repository = image_repository
 
-    def get_image(self, image_id: int) -> Image:
-        image = self.image_repository.get_by_id(image_id)
+    async def get_image(self, image_id: int) -> Image:
+        # Every read of the request follows, so they all move to the primary together.
+        if await replica_freshness.recently_written(image_id):
+            route_reads_to_primary(self.image_repository.db)
+        image = await shared_cache.get_image_async(image_id, self.image_repository.get_by_id)
         if not image:
             raise HTTPException(status_code=404, detail=f"Image {image_id} not found")
         return image
 
-    def get_frames_with_filters(
+    async def get_frames_with_filters(
         self,
         image_id: int,
         depth_min: Optional[float] = None,
         depth_max: Optional[float] = None,
-        page: int = 1,
+        page: Optional[int] = None,
         per_page: int = 100,
-        coloredmap: Optional[bool] = None
-    ) -> Tuple[List[ImageFrame], int, int]:
-        self.get_image(image_id)
+        coloredmap: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        include_total: bool = True,
+        level: int = 0,
+        width: Optional[int] = None
+    ) -> Tuple[FrameBlock, Optional[int], Optional[int], Optional[str]]:
+        image = await self.get_image(image_id)
+        after = self.decode_cursor(cursor)
+        if width == image.target_width:
+            width = None
+
+        # Offset paging is kept only for clients still sending `page`.
+        offset = (page - 1) * per_page if page is not None and after is None else 0
+
+        frames = await self.get_frame_block(
+            image_id, depth_min, depth_max, offset, per_page + 1, coloredmap, after, level, width
+        )
+
+        next_cursor = None
+        if len(frames) > per_page:
+            frames = frames.head(per_page)
+            next_cursor = FrameCursor.encode(float(frames.depths[-1]), int(frames.ids[-1]))
+
+        total = total_pages = None
+        if include_total:
+            total = await self.count_frames(image, depth_min, depth_max, level)
+            total_pages = (total + per_page - 1) // per_page if total > 0 else 0
+
+        logger.info(f"Retrieved {len(frames)} frames for image {image_id} (level: {level}, total: {total}, page: {page}/{total_pages})")
 
-        offset = (page - 1) * per_page
+        return frames, total, total_pages, next_cursor
 
-        frames, total = self.frame_repository.get_frames_with_filters(
+    async def get_frame_block(
+        self,
+        image_id: int,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        offset: int,
+        limit: int,
+        coloredmap: Optional[bool],
+        after: Optional[Tuple[float, int]],
+        level: int,
+        width: Optional[int] = None
+    ) -> FrameBlock:
+        """
+        Read a block through the local and shared caches.
+
+        With `width`, the block at the stored width is resampled and cached under its own key,
+        so frequently requested widths are served without resampling again.
+        """
+        # The shared version is part of the key so a write committed by another worker retires local blocks too.
+        version = await shared_cache.version_async(image_id)
+        key = (depth_min, depth_max, level, coloredmap is True, offset, after, limit, version, width)
+        frames = frame_block_cache.get(image_id, key)
+        if frames is not None:
+            return frames
+
+        # Taken before the read so a write committing meanwhile keeps this block out of the cache.
+        generation = frame_block_cache.generation(image_id)
+        if shared_cache.shared and version is not None:
+            frames = await shared_cache.get_frame_block_async(image_id, version, key)
+            if frames is not None:
+                frame_block_cache.set(image_id, key, frames, generation)
+                return frames
+
+        if width is None:
+            frames = await self.frame_repository.get_frame_block(
+                image_id=image_id,
+                depth_min=depth_min,
+                depth_max=depth_max,
+                skip=offset,
+                limit=limit,
+                coloredmap=coloredmap,
+                after=after,
+                level=level
+            )
+        else:
+            stored = await self.get_frame_block(image_id, depth_min, depth_max, offset, limit, coloredmap, after, level)
+            frames = stored.with_matrix(await run_in_threadpool(ImageProcessor.resample_width, stored.matrix, width))
+        frame_block_cache.set(image_id, key, frames, generation)
+        if shared_cache.shared and version is not None:
+            await shared_cache.set_frame_block_async(image_id, version, key, frames)
+        return frames
+
+    async def iter_frames_with_filters(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        limit: int = 100,
+        coloredmap: Optional[bool] = None,
+        cursor: Optional[str] = None,
+        level: int = 0
+    ) -> AsyncIterator[ImageFrame]:
+        await self.get_image(image_id)
+
+        return self.frame_repository.iter_frames_with_filters(
             image_id=image_id,
             depth_min=depth_min,
             depth_max=depth_max,
-            skip=offset,
-            limit=per_page,
-            coloredmap=coloredmap
+            limit=limit,
+            coloredmap=coloredmap,
+            after=self.decode_cursor(cursor),
+            level=level
         )
 
-        total_pages = (total + per_page - 1) // per_page if total > 0 else 0
+    @staticmethod
+    def decode_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+        if cursor is None:
+            return None
+        try:
+            return FrameCursor.decode(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
-        logger.info(f"Retrieved {len(frames)} frames for image {image_id} (total: {total}, page: {page}/{total_pages})")
+    async def select_level(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        resolution: Optional[int] = None,
+        coloredmap: Optional[bool] = None
+    ) -> int:
+        """
+        Pick the coarsest pyramid level that still returns at least `resolution` frames for the depth range.
+        """
+        image = await self.get_image(image_id)
+        # Materialized colormaps only exist at full resolution.
+        if resolution is None or coloredmap is True or not image.pyramid_levels:
+            return 0
+
+        if depth_min is None and depth_max is None:
+            frame_count = image.total_frames
+        else:
+            # Estimated from the coarsest level so the cost does not grow with the image.
+            top = image.pyramid_levels
+            frame_count = await self.count_frames(image, depth_min, depth_max, top) << top
+
+        return PyramidBuilder.select_level(frame_count, image.pyramid_levels, resolution)
+
+    async def count_frames(
+        self,
+        image: Image,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        level: int = 0
+    ) -> int:
+        if depth_min is None and depth_max is None and level == 0:
+            # Ingest commits total_frames in the same transaction as the frames.
+            return image.total_frames
 
-        return frames, total, total_pages
\ No newline at end of file
+        # Read before the count, like get_frame_block, so a total counted across a write is filed under the old version.
+        version = await shared_cache.version_async(image.id)
+        total = frame_count_cache.get(image.id, depth_min, depth_max, level, version)
+        if total is None:
+            total = await self.frame_repository.count_frames_in_range(image.id, depth_min, depth_max, level)
+            frame_count_cache.set(image.id, depth_min, depth_max, total, level, version)
+        return total
@@ -0,0 +1,247 @@
+import logging
+import os
+from abc import ABC, abstractmethod
+from enum import Enum
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+SOURCE_WIDTH = 200
+
+# One frame of the binary layouts: a little-endian float64 depth followed by the raw pixels.
+RECORD_DTYPE = np.dtype([("depth", "<f8"), ("pixels", "u1", (SOURCE_WIDTH,))])
+
+
+class SourceFormat(str, Enum):
+    csv = "csv"
+    parquet = "parquet"
+    npy = "npy"
+    raw = "raw"
+
+
+EXTENSIONS = {
+    ".csv": SourceFormat.csv,
+    ".parquet": SourceFormat.parquet,
+    ".pq": SourceFormat.parquet,
+    ".npy": SourceFormat.npy,
+    ".bin": SourceFormat.raw,
+    ".raw": SourceFormat.raw,
+}
+
+
+class FrameSource(ABC):
+    """
+    A file of frames: one depth and SOURCE_WIDTH grayscale pixels per row.
+    """
+    format: SourceFormat
+
+    def __init__(self, path: str, start: int = 0):
+        self.path = path
+        # Byte offset of the first row to read; non-zero for the appended tail of a source.
+        self.start = start
+
+    @abstractmethod
+    def blocks(self, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Yield unvalidated (depths, pixels) blocks of at most `chunk_rows` rows, in file order.
+        """
+        ...
+
+    def tail(self, offset: int) -> Optional["FrameSource"]:
+        """
+        The rows stored after the first `offset` bytes, or None when the format cannot be read from there.
+        """
+        return None
+
+    @staticmethod
+    def frame_arrays(frame: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Split a tabular chunk into depths (first column) and pixels (the following columns).
+        """
+        frame = frame.iloc[:, :SOURCE_WIDTH + 1]
+        if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in frame.dtypes):
+            frame = frame.apply(pd.to_numeric, errors="coerce")
+
+        values = frame.to_numpy(dtype=np.float64)
+        return values[:, 0], values[:, 1:]
+
+    @staticmethod
+    def validate(depths: np.ndarray, pixels: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Drop invalid rows and return (depths, pixels) as float64 and uint8.
+
+        Rows are dropped when the depth or any pixel is missing or non-finite,
+        or when a pixel falls outside [0, 255] after truncation to an integer.
+        """
+        if pixels.ndim != 2 or pixels.shape[1] < SOURCE_WIDTH:
+            logger.error(f"Expected {SOURCE_WIDTH} pixel columns, got {pixels.shape[-1] if pixels.ndim else 0}")
+            return np.empty(0, dtype=np.float64), np.empty((0, SOURCE_WIDTH), dtype=np.uint8)
+
+        depths = np.asarray(depths, dtype=np.float64)
+        pixels = pixels[:, :SOURCE_WIDTH]
+
+        # uint8 pixels from the binary layouts are valid by construction; only depths need checking.
+        if pixels.dtype == np.uint8:
+            valid = np.isfinite(depths)
+            if valid.all():
+                return depths, pixels
+            return depths[valid], pixels[valid]
+
+        pixels = np.asarray(pixels, dtype=np.float64)
+        valid = np.isfinite(depths) & np.isfinite(pixels).all(axis=1)
+        pixels = np.trunc(pixels[valid])
+        depths = depths[valid]
+
+        in_range = ((pixels >= 0) & (pixels <= 255)).all(axis=1)
+        return depths[in_range], pixels[in_range].astype(np.uint8)
+
+
+class CsvSource(FrameSource):
+    format = SourceFormat.csv
+
+    def blocks(self, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        if not self.start:
+            for chunk in pd.read_csv(self.path, chunksize=chunk_rows):
+                yield self.frame_arrays(chunk)
+            return
+
+        columns = self.read_header(self.path)
+        with open(self.path, "rb") as f:
+            f.seek(self.start)
+            for chunk in pd.read_csv(f, header=None, names=columns, chunksize=chunk_rows):
+                yield self.frame_arrays(chunk)
+
+    def tail(self, offset: int) -> Optional["CsvSource"]:
+        with open(self.path, "rb") as f:
+            header_bytes = len(f.readline())
+            if offset < header_bytes:
+                return None
+            # An offset inside a line means the old file ended mid-row; that row cannot be completed in place.
+            f.seek(offset - 1)
+            if f.read(1) != b"\n":
+                return None
+        return CsvSource(self.path, start=offset)
+
+    @staticmethod
+    def read_header(path: str) -> List[str]:
+        with open(path, "rb") as f:
+            return f.readline().decode().strip().split(",")
+
+
+class ParquetSource(FrameSource):
+    """
+    Parquet file with the same column order as the CSV, read one record batch at a time.
+    """
+    format = SourceFormat.parquet
+
+    def blocks(self, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(self.path).iter_batches(batch_size=chunk_rows):
+            yield self.frame_arrays(batch.to_pandas())
+
+
+class RecordSource(FrameSource):
+    """
+    Memory-mapped array of RECORD_DTYPE; blocks are views into the page cache, nothing is parsed.
+    """
+
+    def __init__(self, path: str, start: int = 0):
+        super().__init__(path, start)
+        self.records = self.open_records()
+
+    @abstractmethod
+    def open_records(self) -> np.ndarray:
+        ...
+
+    def blocks(self, chunk_rows: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        for start in range(0, len(self.records), chunk_rows):
+            block = self.records[start:start + chunk_rows]
+            yield block["depth"], block["pixels"]
+
+
+class NpySource(RecordSource):
+    format = SourceFormat.npy
+
+    def open_records(self) -> np.ndarray:
+        records = np.load(self.path, mmap_mode="r")
+        if records.dtype != RECORD_DTYPE or records.ndim != 1:
+            raise ValueError(f"{self.path} must be a 1-D array of dtype {RECORD_DTYPE.descr}")
+        return records
+
+
+class RawSource(RecordSource):
+    """
+    Headerless file of packed RECORD_DTYPE records, as written by `write`.
+    """
+    format = SourceFormat.raw
+
+    def open_records(self) -> np.ndarray:
+        size = os.path.getsize(self.path)
+        if size % RECORD_DTYPE.itemsize:
+            raise ValueError(f"{self.path} is not a whole number of {RECORD_DTYPE.itemsize}-byte records")
+        if size == self.start:
+            return np.empty(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode="r", offset=self.start)
+
+    def tail(self, offset: int) -> Optional["RawSource"]:
+        if offset % RECORD_DTYPE.itemsize:
+            return None
+        return RawSource(self.path, start=offset)
+
+    @staticmethod
+    def write(path: str, source: FrameSource, chunk_rows: int) -> Tuple[int, int]:
+        """
+        Convert any source to the raw layout, dropping invalid rows.
+
+        Returns:
+            Tuple of (rows written, rows dropped).
+        """
+        written = dropped = 0
+        with open(path, "wb") as f:
+            for depths, pixels in source.blocks(chunk_rows):
+                valid_depths, valid_pixels = source.validate(depths, pixels)
+                records = np.empty(len(valid_depths), dtype=RECORD_DTYPE)
+                records["depth"] = valid_depths
+                records["pixels"] = valid_pixels
+                records.tofile(f)
+                written += len(records)
+                dropped += len(depths) - len(records)
+        return written, dropped
+
+
+SOURCES = {
+    SourceFormat.csv: CsvSource,
+    SourceFormat.parquet: ParquetSource,
+    SourceFormat.npy: NpySource,
+    SourceFormat.raw: RawSource,
+}
+
+
+def resolve_source_path(path: str) -> str:
+    """
+    Resolve `path` against the ingest data directory, refusing anything outside it.
+    """
+    data_dir = Path(settings.ingest_data_dir).resolve()
+    resolved = (data_dir / path).resolve()
+    if resolved != data_dir and data_dir not in resolved.parents:
+        raise ValueError(f"Source {path} is outside the data directory")
+    if not resolved.is_file():
+        raise ValueError(f"Source {path} not found")
+    return str(resolved)
+
+
+def open_source(path: str, source_format: Optional[SourceFormat] = None) -> FrameSource:
+    """
+    Open a source under the data directory; the format defaults to the one implied by the extension.
+    """
+    resolved = resolve_source_path(path)
+    if source_format is None:
+        source_format = EXTENSIONS.get(Path(resolved).suffix.lower())
+        if source_format is None:
+            raise ValueError(f"Cannot infer the format of {path}; pass one of {[f.value for f in SourceFormat]}")
+    return SOURCES[source_format](resolved)
@@ -1,5 +1,5 @@
 import numpy as np
-from typing import List
+from typing import List, Tuple
 import cv2
 
 
@@ -12,6 +12,49 @@ class ImageProcessor:
 
         return resized.flatten().tolist()
 
+    @staticmethod
+    def resize_image_block(pixels: np.ndarray, target_width: int = 150) -> np.ndarray:
+        block = np.ascontiguousarray(pixels, dtype=np.uint8)
+
+        return cv2.resize(block, (target_width, block.shape[0]), interpolation=cv2.INTER_LINEAR)
+
+    @staticmethod
+    def resample_depth(matrix: np.ndarray, height: int) -> np.ndarray:
+        if matrix.shape[0] == height:
+            return matrix
+        # INTER_AREA averages rows when shrinking; it degrades to bilinear when enlarging.
+        interpolation = cv2.INTER_AREA if height < matrix.shape[0] else cv2.INTER_LINEAR
+        return cv2.resize(matrix, (matrix.shape[1], height), interpolation=interpolation)
+
+    @staticmethod
+    def resample_width(matrix: np.ndarray, width: int) -> np.ndarray:
+        """
+        Resample the rows of an N x W (or N x W x 3) block to `width` pixels in one call.
+        """
+        if matrix.shape[1] == width:
+            return matrix
+        if len(matrix) == 0:
+            return np.empty((0, width) + matrix.shape[2:], dtype=matrix.dtype)
+        interpolation = cv2.INTER_AREA if width < matrix.shape[1] else cv2.INTER_LINEAR
+        return cv2.resize(np.ascontiguousarray(matrix), (width, matrix.shape[0]), interpolation=interpolation)
+
+    @staticmethod
+    def reduce_depth(depths: np.ndarray, pixels: np.ndarray, factor: int = 2) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Area-average every `factor` consecutive rows into one; a trailing partial group is averaged on its own.
+
+        Returns float arrays so repeated reductions do not accumulate rounding error.
+        """
+        full = len(depths) // factor * factor
+        reduced_depths = depths[:full].reshape(-1, factor).mean(axis=1)
+        reduced_pixels = pixels[:full].reshape(-1, factor, pixels.shape[1]).mean(axis=1, dtype=np.float32)
+
+        if full < len(depths):
+            reduced_depths = np.append(reduced_depths, depths[full:].mean())
+            reduced_pixels = np.vstack([reduced_pixels, pixels[full:].mean(axis=0, dtype=np.float32)])
+
+        return reduced_depths, reduced_pixels
+
     @staticmethod
     def validate_pixel_values(pixels: List[int]) -> bool:
         return all(0 <= p <= 255 for p in pixels)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import hashlib
+import logging
+from enum import Enum
+from typing import Optional, Tuple
+import cv2
+import numpy as np
+from fastapi import Depends, HTTPException
+from starlette.concurrency import run_in_threadpool
+from src.cache import replica_freshness, shared_cache
+from src.config import settings
+from src.database import route_reads_to_primary
+from src.models import Image
+from src.repositories import AsyncImageFrameRepository, AsyncImageRepository
+from src.services.image_processor import ImageProcessor
+from src.services.pyramid_builder import PyramidBuilder
+from src.utils.colormap import ColormapHandler
+
+logger = logging.getLogger(__name__)
+
+WEBP_MAX_DIMENSION = 16383
+
+
+class RenderFormat(str, Enum):
+    png = "png"
+    webp = "webp"
+
+
+class ImageRenderer:
+
+    def __init__(
+        self,
+        frame_repository: AsyncImageFrameRepository = Depends(),
+        image_repository: AsyncImageRepository = Depends()
+    ):
+        self.frame_repository = frame_repository
+        self.image_repository = image_repository
+
+    async def get_image(self, image_id: int) -> Image:
+        # Every read of the request follows, so they all move to the primary together.
+        if await replica_freshness.recently_written(image_id):
+            route_reads_to_primary(self.image_repository.db)
+        image = await shared_cache.get_image_async(image_id, self.image_repository.get_by_id)
+        if not image:
+            raise HTTPException(status_code=404, detail=f"Image {image_id} not found")
+        return image
+
+    @staticmethod
+    def etag(
+        image: Image,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        colormap_name: Optional[str],
+        height: Optional[int],
+        render_format: RenderFormat
+    ) -> str:
+        """
+        Derive the ETag from the request and the image's ingest state.
+
+        Renders only read grayscale pixels and pyramid levels, which change only
+        when frames are ingested, so no pixel data has to be read to answer If-None-Match.
+        """
+        key = (
+            f"{image.id}:{image.created_at}:{image.total_frames}:{image.pyramid_levels}:"
+            f"{depth_min}:{depth_max}:{colormap_name}:{height}:{render_format.value}"
+        )
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
+
+    async def plan(
+        self,
+        image: Image,
+        depth_min: Optional[float],
+        depth_max: Optional[float],
+        height: Optional[int],
+        render_format: RenderFormat
+    ) -> Tuple[Optional[int], int]:
+        """
+        Pick the output height and the coarsest pyramid level that still has at least that many rows.
+
+        Without `height`, ranges longer than `render_max_height` frames are resampled down to it
+        rather than loaded and encoded at full length.
+        """
+        frame_count = None
+        if height is None or image.pyramid_levels:
+            frame_count = await self.frame_count(image, depth_min, depth_max)
+            if height is None and frame_count > settings.render_max_height:
+                height = settings.render_max_height
+
+        rows = height if height is not None else frame_count
+        if render_format == RenderFormat.webp and max(rows, image.target_width) > WEBP_MAX_DIMENSION:
+            raise HTTPException(
+                status_code=400,
+                detail=f"WebP images are limited to {WEBP_MAX_DIMENSION} pixels per side; pass a smaller height or use png"
+            )
+
+        if height is None or not image.pyramid_levels:
+            return height, 0
+        return height, PyramidBuilder.select_level(frame_count, image.pyramid_levels, height)
+
+    async def frame_count(self, image: Image, depth_min: Optional[float], depth_max: Optional[float]) -> int:
+        if depth_min is None and depth_max is None:
+            return image.total_frames
+
+        # Estimated from the coarsest level so the cost does not grow with the image.
+        top = image.pyramid_levels
+        return await self.frame_repository.count_frames_in_range(image.id, depth_min, depth_max, top) << top
+
+    async def render(
+        self,
+        image_id: int,
+        depth_min: Optional[float] = None,
+        depth_max: Optional[float] = None,
+        colormap_name: Optional[str] = None,
+        height: Optional[int] = None,
+        render_format: RenderFormat = RenderFormat.png,
+        level: int = 0
+    ) -> bytes:
+        _, matrix = await self.frame_repository.get_depth_matrix(image_id, depth_min, depth_max, level)
+        if matrix.shape[0] == 0:
+            raise HTTPException(status_code=404, detail=f"No frames found for image {image_id} in depth range")
+
+        # Resampling and encoding are CPU-bound; keep them off the event loop.
+        encoded, shape = await run_in_threadpool(self.encode, matrix, colormap_name, height, render_format)
+
+        logger.info(
+            f"Rendered image {image_id} as {render_format.value} from pyramid level {level}: "
+            f"{shape[1]}x{shape[0]}, {len(encoded)} bytes"
+        )
+        return encoded
+
+    @staticmethod
+    def encode(
+        matrix: np.ndarray,
+        colormap_name: Optional[str],
+        height: Optional[int],
+        render_format: RenderFormat
+    ) -> Tuple[bytes, Tuple[int, ...]]:
+        if height is not None:
+            matrix = ImageProcessor.resample_depth(matrix, height)
+
+        if colormap_name is not None:
+            # OpenCV encoders expect BGR channel order.
+            matrix = ColormapHandler.apply_colormap_batch(matrix, colormap_name)[..., ::-1]
+
+        ok, encoded = cv2.imencode(f".{render_format.value}", matrix)
+        if not ok:
+            raise ValueError(f"Failed to encode {render_format.value} image")
+
+        return encoded.tobytes(), matrix.shape
@@ -0,0 +1,187 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from typing import Callable, Dict, Optional, Set
+from src.config import settings
+from src.profiling import ProfileMode, profiler, requested_profile
+
+logger = logging.getLogger(__name__)
+
+
+class JobStatus(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+    cancelled = "cancelled"
+
+
+class JobCancelledError(Exception):
+    pass
+
+
+@dataclass
+class WorkerStats:
+    rows: int = 0
+    seconds: float = 0.0
+
+    @property
+    def throughput(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: Dict
+    status: JobStatus = JobStatus.pending
+    image_id: Optional[int] = None
+    frames_processed: int = 0
+    rows_dropped: int = 0
+    ingest_mode: Optional[str] = None
+    error: Optional[str] = None
+    worker_stats: Dict[str, WorkerStats] = field(default_factory=dict)
+    profile: Optional[ProfileMode] = None
+    profile_id: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    _started: Optional[float] = field(default=None, repr=False)
+    _finished: Optional[float] = field(default=None, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JobStatus.completed, JobStatus.failed, JobStatus.cancelled)
+
+    @property
+    def elapsed_seconds(self) -> float:
+        if self._started is None:
+            return 0.0
+        return (self._finished or time.monotonic()) - self._started
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.frames_processed / elapsed if elapsed > 0 else 0.0
+
+    def report_progress(self, frames_processed: int, rows_dropped: int = 0) -> None:
+        self.frames_processed = frames_processed
+        self.rows_dropped += rows_dropped
+
+    def report_worker(self, worker: str, rows: int, seconds: float) -> None:
+        stats = self.worker_stats.setdefault(worker, WorkerStats())
+        stats.rows += rows
+        stats.seconds += seconds
+
+    def check_cancelled(self) -> None:
+        if self.cancel_event.is_set():
+            raise JobCancelledError(f"Job {self.id} was cancelled")
+
+
+class JobManager:
+
+    def __init__(self, max_workers: int, max_finished_jobs: int = 100):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.max_finished_jobs = max_finished_jobs
+        self._jobs: Dict[str, Job] = {}
+        self._timers: Set[threading.Timer] = set()
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, target: Callable[..., None], **params) -> Job:
+        job = Job(id=uuid.uuid4().hex, kind=kind, params=params, profile=requested_profile.get())
+        with self._lock:
+            self._prune_finished()
+            self._jobs[job.id] = job
+
+        self.executor.submit(self._run, job, target)
+        logger.info(f"Queued {kind} job {job.id}")
+        return job
+
+    def submit_later(self, delay: float, kind: str, target: Callable[..., None], **params) -> None:
+        """
+        Submit a job after `delay` seconds, unless the manager shuts down first.
+        """
+        def fire():
+            with self._lock:
+                self._timers.discard(timer)
+                if self._closed:
+                    return
+            self.submit(kind, target, **params)
+
+        timer = threading.Timer(delay, fire)
+        timer.daemon = True
+        with self._lock:
+            self._timers.add(timer)
+        timer.start()
+        logger.info(f"Scheduled {kind} job in {delay:.0f}s")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return None
+
+        job.cancel_event.set()
+        if job.status == JobStatus.pending:
+            self._finish(job, JobStatus.cancelled)
+        logger.info(f"Cancellation requested for job {job_id}")
+        return job
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._closed = True
+            for timer in self._timers:
+                timer.cancel()
+            self._timers.clear()
+        for job in list(self._jobs.values()):
+            if not job.is_finished:
+                job.cancel_event.set()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _run(self, job: Job, target: Callable[..., None]) -> None:
+        if job.cancel_event.is_set():
+            return
+
+        job.status = JobStatus.running
+        job.started_at = datetime.now(timezone.utc)
+        job._started = time.monotonic()
+
+        try:
+            with profiler.profile_job(job):
+                target(job, **job.params)
+        except JobCancelledError:
+            self._finish(job, JobStatus.cancelled)
+            logger.info(f"Job {job.id} cancelled after {job.frames_processed} frames")
+        except Exception as e:
+            job.error = str(e)
+            self._finish(job, JobStatus.failed)
+            logger.error(f"Job {job.id} failed: {e}")
+        else:
+            self._finish(job, JobStatus.completed)
+            logger.info(
+                f"Job {job.id} completed: {job.frames_processed} frames "
+                f"in {job.elapsed_seconds:.1f}s ({job.throughput:.0f} frames/s)"
+            )
+
+    def _finish(self, job: Job, status: JobStatus) -> None:
+        job.status = status
+        job.finished_at = datetime.now(timezone.utc)
+        job._finished = time.monotonic()
+
+    def _prune_finished(self) -> None:
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        for job in sorted(finished, key=lambda j: j.created_at)[:-self.max_finished_jobs or None]:
+            del self._jobs[job.id]
+
+
+job_manager = JobManager(max_workers=settings.job_workers)
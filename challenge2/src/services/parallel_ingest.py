@@ -0,0 +1,149 @@
+import io
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from src.services.job_manager import Job
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RangeResult:
+    index: int
+    depths: np.ndarray
+    pixels: np.ndarray
+    rows_read: int
+    worker: str
+    seconds: float
+    parse_seconds: float
+    resize_seconds: float
+
+
+def split_line_ranges(
+    path: str,
+    range_bytes: int,
+    start: Optional[int] = None
+) -> Tuple[List[str], List[Tuple[int, int]]]:
+    """
+    Split a CSV file into byte ranges of about `range_bytes` that start and end on line boundaries.
+
+    Ranges begin after the header, or at `start`, which must itself be a line boundary.
+    Returns the header's column names and the (start, end) offsets of the data ranges.
+    """
+    size = os.path.getsize(path)
+    ranges = []
+
+    with open(path, "rb") as f:
+        columns = f.readline().decode().strip().split(",")
+        start = start or f.tell()
+
+        while start < size:
+            f.seek(min(start + range_bytes, size))
+            # Finish the line the seek landed in so the next range starts on a fresh one.
+            f.readline()
+            end = min(f.tell(), size)
+            ranges.append((start, end))
+            start = end
+
+    return columns, ranges
+
+
+def parse_csv_range(
+    index: int,
+    path: str,
+    start: int,
+    end: int,
+    columns: List[str],
+    target_width: int
+) -> RangeResult:
+    """
+    Worker-process entry point: parse, validate and resize one byte range.
+    """
+    from src.services.data_loader import DataLoader
+    from src.services.frame_sources import FrameSource
+
+    began = time.perf_counter()
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns)
+    depths, pixels = DataLoader.validate_block(*FrameSource.frame_arrays(chunk))
+    parsed = time.perf_counter()
+    pixels = DataLoader.resize_block(pixels, target_width)
+    finished = time.perf_counter()
+
+    return RangeResult(
+        index=index,
+        depths=depths,
+        pixels=pixels,
+        rows_read=len(chunk),
+        worker=f"pid-{os.getpid()}",
+        seconds=finished - began,
+        parse_seconds=parsed - began,
+        resize_seconds=finished - parsed
+    )
+
+
+class ParallelCsvReader:
+    """
+    Parses a CSV file in a process pool, one line-aligned byte range per task.
+
+    At most two ranges per worker are in flight, which bounds memory to a few
+    ranges regardless of file size. With `ordered`, results come back in file
+    order; otherwise in completion order, so one slow range cannot stall the writer.
+    """
+
+    def __init__(self, workers: int, range_bytes: int, ordered: bool = True):
+        self.workers = workers
+        self.range_bytes = range_bytes
+        self.ordered = ordered
+
+    def read(
+        self,
+        path: str,
+        target_width: int,
+        job: Optional[Job] = None,
+        start: Optional[int] = None
+    ) -> Iterator[RangeResult]:
+        columns, ranges = split_line_ranges(path, self.range_bytes, start)
+        logger.info(f"Parsing {path} as {len(ranges)} byte ranges on {self.workers} processes")
+
+        # Spawned workers do not inherit the parent's threads, locks or open connections.
+        executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+        pending = deque()
+        next_range = 0
+
+        try:
+            while next_range < len(ranges) or pending:
+                while next_range < len(ranges) and len(pending) < self.workers * 2:
+                    start, end = ranges[next_range]
+                    pending.append(executor.submit(
+                        parse_csv_range, next_range, path, start, end, columns, target_width
+                    ))
+                    next_range += 1
+
+                if job:
+                    job.check_cancelled()
+
+                for future in self._completed(pending):
+                    yield future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _completed(self, pending: deque) -> List[Future]:
+        if self.ordered:
+            # The caller blocks on result(), so ranges are written strictly in file order.
+            return [pending.popleft()]
+
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            pending.remove(future)
+        return list(done)
@@ -0,0 +1,78 @@
+import logging
+from typing import List, Optional, Tuple
+import numpy as np
+from src.config import settings
+from src.repositories import ImageFrameRepository, ImageFrameLevelRepository, ImageRepository
+from src.services.image_processor import ImageProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PyramidBuilder:
+    """
+    Builds the depth pyramid of an image: level L averages 2^L consecutive frames.
+
+    Overview reads go to the coarsest level that still has enough rows, so
+    their cost is bounded by `pyramid_min_rows` rather than the image size.
+    """
+
+    def __init__(
+        self,
+        frame_repository: ImageFrameRepository,
+        level_repository: ImageFrameLevelRepository,
+        image_repository: ImageRepository
+    ):
+        self.frame_repository = frame_repository
+        self.level_repository = level_repository
+        self.image_repository = image_repository
+
+    @staticmethod
+    def level_count(total_frames: int) -> int:
+        levels = 0
+        while levels < settings.pyramid_max_levels and total_frames >> (levels + 1) >= settings.pyramid_min_rows:
+            levels += 1
+        return levels
+
+    @staticmethod
+    def select_level(frame_count: int, pyramid_levels: int, min_rows: Optional[int]) -> int:
+        """
+        Pick the coarsest level that still yields at least `min_rows` rows for `frame_count` full-resolution frames.
+        """
+        if min_rows is None:
+            return 0
+        level = 0
+        while level < pyramid_levels and frame_count >> (level + 1) >= min_rows:
+            level += 1
+        return level
+
+    def build(self, image_id: int, total_frames: int) -> int:
+        levels = self.level_count(total_frames)
+        self.level_repository.delete_by_image(image_id, commit=False)
+
+        if levels:
+            # Blocks aligned to 2^levels rows reduce independently without straddling a group.
+            group = 1 << levels
+            chunk_rows = max(settings.pyramid_chunk_rows // group, 1) * group
+
+            for depths, pixels in self.frame_repository.iter_depth_blocks(image_id, chunk_size=chunk_rows):
+                for level, (level_depths, level_pixels) in enumerate(self.reduce_block(depths, pixels, levels), 1):
+                    self.level_repository.insert_level(
+                        image_id,
+                        level,
+                        level_depths,
+                        np.rint(level_pixels).astype(np.uint8)
+                    )
+
+        # Commits the levels together with the level count readers select on.
+        self.image_repository.update(image_id, pyramid_levels=levels)
+        logger.info(f"Built {levels} pyramid levels for image {image_id} from {total_frames} frames")
+
+        return levels
+
+    @staticmethod
+    def reduce_block(depths: np.ndarray, pixels: np.ndarray, levels: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        reduced = []
+        for _ in range(levels):
+            depths, pixels = ImageProcessor.reduce_depth(depths, pixels, 2)
+            reduced.append((depths, pixels))
+        return reduced
@@ -1,3 +1,6 @@
 from .colormap import ColormapHandler
+from .pixel_codec import PixelCodec, RGB_CHANNELS
+from .cursor import FrameCursor
+from .fingerprint import SourceFingerprint
 
-__all__ = ["ColormapHandler"]
\ No newline at end of file
+__all__ = ["ColormapHandler", "PixelCodec", "RGB_CHANNELS", "FrameCursor", "SourceFingerprint"]
@@ -4,14 +4,16 @@ from typing import List, Union, Dict
 
 
 class ColormapHandler:
-  
+
     AVAILABLE_COLORMAPS: List[str] = [
-        "viridis", "plasma", "inferno", "magma",
-        "jet", "hot", "cool", "spring", "summer",
-        "autumn", "winter", "gray", "bone"
+        "viridis", "plasma", "inferno", "magma", "cividis",
+        "turbo", "jet", "hot", "cool", "spring", "summer",
+        "autumn", "winter", "bone", "copper", "gray",
+        "rainbow", "ocean", "terrain"
     ]
 
     _COLORMAP_CACHE: Dict[str, cm.ScalarMappable] = {}
+    _LUT_CACHE: Dict[str, np.ndarray] = {}
 
     @classmethod
     def get_colormap(cls, name: str):
@@ -24,6 +26,28 @@ class ColormapHandler:
             cls._COLORMAP_CACHE[name] = cm.get_cmap(name)
         return cls._COLORMAP_CACHE[name]
 
+    @classmethod
+    def get_lut(cls, name: str) -> np.ndarray:
+        """
+        Retrieve the 256x3 uint8 lookup table for a colormap.
+
+        Inputs are always uint8, so sampling the colormap once at every
+        grayscale level gives exactly the values a per-pixel call would.
+        """
+        lut = cls._LUT_CACHE.get(name)
+        if lut is None:
+            cmap = cls.get_colormap(name)
+            rgba = cmap(np.arange(256) / 255.0)[:, :3]
+            lut = (rgba * 255).astype(np.uint8)
+            lut.setflags(write=False)
+            cls._LUT_CACHE[name] = lut
+        return lut
+
+    @classmethod
+    def precompute_luts(cls) -> None:
+        for name in cls.AVAILABLE_COLORMAPS:
+            cls.get_lut(name)
+
     @classmethod
     def apply_colormap(
         cls,
@@ -40,19 +64,26 @@ class ColormapHandler:
         Returns:
             List of [R, G, B] values.
         """
-        cmap = cls.get_colormap(colormap_name)
-
-        # Convert to numpy array
-        grayscale_values = np.asarray(grayscale_values, dtype=np.uint8)
+        return cls.apply_colormap_batch(grayscale_values, colormap_name).tolist()
 
-        # Normalize to [0, 1] for colormap
-        normalized = grayscale_values / 255.0
+    @classmethod
+    def apply_colormap_batch(
+        cls,
+        grayscale_values: np.ndarray,
+        colormap_name: str = "viridis"
+    ) -> np.ndarray:
+        """
+        Map a whole grayscale array to RGB with a single lookup-table gather.
 
-        # Apply colormap (vectorized)
-        rgba = cmap(normalized)[:, :3]  # Drop alpha channel
-        rgb = (rgba * 255).astype(np.uint8)
+        Args:
+            grayscale_values: uint8 array of any shape, typically N x W frames.
+            colormap_name: Name of the colormap to use.
 
-        return rgb.tolist()
+        Returns:
+            uint8 array with a trailing RGB axis, e.g. N x W x 3.
+        """
+        lut = cls.get_lut(colormap_name)
+        return lut[np.asarray(grayscale_values, dtype=np.uint8)]
 
     @classmethod
     def is_valid_colormap(cls, colormap_name: str) -> bool:
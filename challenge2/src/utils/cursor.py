@@ -0,0 +1,23 @@
+import base64
+import json
+from typing import Tuple
+
+
+class FrameCursor:
+
+    @staticmethod
+    def encode(depth: float, frame_id: int) -> str:
+        """
+        Encode the (depth, id) position of the last returned frame as an opaque token.
+        """
+        payload = json.dumps([depth, frame_id], separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    @staticmethod
+    def decode(cursor: str) -> Tuple[float, int]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            depth, frame_id = json.loads(base64.urlsafe_b64decode(padded))
+            return float(depth), int(frame_id)
+        except (ValueError, TypeError) as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
@@ -0,0 +1,55 @@
+import hashlib
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+READ_BYTES = 8 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class SourceFingerprint:
+    sha256: str
+    size: int
+    mtime: float
+    # SHA-256 of the first `prefix_size` bytes, taken in the same pass as the full hash.
+    prefix_size: Optional[int] = None
+    prefix_sha256: Optional[str] = None
+
+    @classmethod
+    def compute(cls, path: str, prefix_size: Optional[int] = None) -> "SourceFingerprint":
+        """
+        Hash a file in one streaming pass.
+
+        With `prefix_size`, the hash state is also captured when the read reaches
+        that offset, which is how an earlier version of an appended file is recognised.
+        """
+        stat = os.stat(path)
+        digest = hashlib.sha256()
+        prefix_sha256 = None
+        position = 0
+
+        with open(path, "rb") as f:
+            while True:
+                to_read = READ_BYTES
+                if prefix_sha256 is None and prefix_size is not None:
+                    to_read = min(to_read, prefix_size - position) or READ_BYTES
+                data = f.read(to_read)
+
+                if prefix_sha256 is None and prefix_size is not None and position == prefix_size:
+                    prefix_sha256 = digest.copy().hexdigest()
+                if not data:
+                    break
+
+                digest.update(data)
+                position += len(data)
+
+        return cls(
+            sha256=digest.hexdigest(),
+            size=position,
+            mtime=stat.st_mtime,
+            prefix_size=prefix_size if prefix_sha256 is not None else None,
+            prefix_sha256=prefix_sha256
+        )
+
+    def columns(self) -> Dict:
+        return {"source_hash": self.sha256, "source_size": self.size, "source_mtime": self.mtime}
@@ -0,0 +1,32 @@
+import numpy as np
+from typing import List, Union
+
+RGB_CHANNELS = 3
+
+
+class PixelCodec:
+
+    @staticmethod
+    def pack(pixels: Union[List[int], List[List[int]], np.ndarray]) -> bytes:
+        """
+        Pack grayscale or RGB pixel values into a contiguous uint8 buffer.
+        """
+        return np.ascontiguousarray(pixels, dtype=np.uint8).tobytes()
+
+    @staticmethod
+    def unpack(data: bytes, width: int, channels: int = 1) -> np.ndarray:
+        """
+        Return a read-only uint8 view over a packed pixel buffer.
+
+        Args:
+            data: Buffer produced by `pack`.
+            width: Number of pixels in the row.
+            channels: 1 for grayscale rows, 3 for RGB rows.
+
+        Returns:
+            Array of shape (width,) or (width, channels).
+        """
+        pixels = np.frombuffer(data, dtype=np.uint8)
+        if channels == 1:
+            return pixels
+        return pixels.reshape(width, channels)
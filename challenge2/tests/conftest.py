@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Settings are read when `src` is first imported, so the test environment is set before any test module loads.
+_workdir = tempfile.mkdtemp(prefix="image-api-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_workdir, 'test.sqlite')}")
+for _name in ("POSTGRES_USER", "POSTGRES_PASSWORD", "POSTGRES_DB"):
+    os.environ.setdefault(_name, "test")
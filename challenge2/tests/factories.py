@@ -0,0 +1,20 @@
+from datetime import datetime, timezone
+import numpy as np
+from src.cache import FrameBlock
+
+
+def make_block(count: int = 4, width: int = 5, rgb: bool = False, image_id: int = 1) -> FrameBlock:
+    shape = (count, width, 3) if rgb else (count, width)
+    matrix = np.arange(np.prod(shape), dtype=np.uint8).reshape(shape)
+    return FrameBlock(
+        image_id=image_id,
+        ids=np.arange(1, count + 1, dtype=np.int64),
+        depths=np.linspace(9000.0, 9000.0 + (count - 1) * 0.1, count),
+        matrix=matrix,
+        has_color=np.array([i % 2 == 0 for i in range(count)]) if rgb else None,
+        colormap_names=tuple("viridis" if rgb and i % 2 == 0 else None for i in range(count)),
+        created_at=tuple(datetime(2025, 1, 1, 0, 0, i, tzinfo=timezone.utc) for i in range(count)),
+        colormap_applied_at=tuple(
+            datetime(2025, 1, 2, tzinfo=timezone.utc) if rgb and i % 2 == 0 else None for i in range(count)
+        )
+    )
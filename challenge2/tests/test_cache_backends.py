@@ -0,0 +1,62 @@
+import time
+import fakeredis
+import pytest
+import src.cache.backends as backends
+from src.cache import InMemoryBackend, RedisBackend
+
+
+@pytest.fixture(params=["memory", "redis"])
+def backend(request):
+    if request.param == "memory":
+        return InMemoryBackend(max_entries=100)
+    return RedisBackend(fakeredis.FakeRedis())
+
+
+def test_get_missing_key_returns_none(backend):
+    assert backend.get("missing") is None
+
+
+def test_set_get_delete(backend):
+    backend.set("key", b"\x00\x01value")
+    assert backend.get("key") == b"\x00\x01value"
+
+    backend.delete("key")
+    assert backend.get("key") is None
+
+
+def test_incr_starts_at_one(backend):
+    assert backend.incr("counter") == 1
+    assert backend.incr("counter") == 2
+    assert int(backend.get("counter")) == 2
+
+
+def test_set_with_ttl_expires(backend, monkeypatch):
+    backend.set("key", b"value", ttl=10)
+    assert backend.get("key") == b"value"
+
+    if isinstance(backend, InMemoryBackend):
+        now = backends.time.monotonic()
+        monkeypatch.setattr(backends.time, "monotonic", lambda: now + 11)
+    else:
+        # Shorten the TTL rather than waiting out whole seconds.
+        backend.client.pexpire("key", 1)
+        time.sleep(0.01)
+
+    assert backend.get("key") is None
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = InMemoryBackend(max_entries=2)
+    backend.set("a", b"1")
+    backend.set("b", b"2")
+    backend.get("a")
+    backend.set("c", b"3")
+
+    assert backend.get("a") == b"1"
+    assert backend.get("b") is None
+    assert backend.get("c") == b"3"
+
+
+def test_redis_backend_is_shared():
+    assert RedisBackend(fakeredis.FakeRedis()).shared
+    assert not InMemoryBackend().shared
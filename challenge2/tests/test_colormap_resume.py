@@ -0,0 +1,52 @@
+import time
+from datetime import datetime, timezone
+import pytest
+from src.config import settings
+from src.database import Base, SessionLocal, engine
+from src.models import ColormapJob, ColormapJobStatus, Image
+from src.services import ColorMapProcessor
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def make_running_job(db) -> int:
+    image = Image(target_width=5, total_frames=0)
+    db.add(image)
+    db.flush()
+    colormap_job = ColormapJob(
+        image_id=image.id,
+        colormap_name="viridis",
+        batch_size=10,
+        total=0,
+        status=ColormapJobStatus.running.value,
+        updated_at=datetime.now(timezone.utc)
+    )
+    db.add(colormap_job)
+    db.commit()
+    return colormap_job.id
+
+
+def wait_for_status(db, colormap_job_id: int, timeout: float) -> str:
+    deadline = time.monotonic() + timeout
+    while True:
+        db.expire_all()
+        status = db.get(ColormapJob, colormap_job_id).status
+        if status != ColormapJobStatus.running.value or time.monotonic() > deadline:
+            return status
+        time.sleep(0.1)
+
+
+def test_restart_takes_over_a_running_job_once_it_goes_stale(db, monkeypatch):
+    # A crash left the job running with a fresh checkpoint, and the process restarted right away.
+    monkeypatch.setattr(settings, "colormap_job_stale_seconds", 1)
+    colormap_job_id = make_running_job(db)
+
+    assert ColorMapProcessor.resume_pending_jobs() >= 1
+
+    assert wait_for_status(db, colormap_job_id, timeout=10) == ColormapJobStatus.completed.value
@@ -0,0 +1,34 @@
+import hashlib
+from src.utils.fingerprint import SourceFingerprint
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_hash_and_size_match_contents(tmp_path):
+    data = b"depth,col1\n1.0,2\n" * 1000
+    fingerprint = SourceFingerprint.compute(write(tmp_path / "a.csv", data))
+
+    assert fingerprint.sha256 == hashlib.sha256(data).hexdigest()
+    assert fingerprint.size == len(data)
+    assert fingerprint.prefix_sha256 is None
+
+
+def test_prefix_hash_recognises_an_appended_file(tmp_path):
+    original = b"depth,col1\n1.0,2\n"
+    appended = original + b"2.0,3\n"
+    before = SourceFingerprint.compute(write(tmp_path / "before.csv", original))
+    after = SourceFingerprint.compute(write(tmp_path / "after.csv", appended), prefix_size=before.size)
+
+    assert after.prefix_size == before.size
+    assert after.prefix_sha256 == before.sha256
+    assert after.sha256 != before.sha256
+
+
+def test_prefix_longer_than_file_is_dropped(tmp_path):
+    fingerprint = SourceFingerprint.compute(write(tmp_path / "a.csv", b"short"), prefix_size=100)
+
+    assert fingerprint.prefix_size is None
+    assert fingerprint.prefix_sha256 is None
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from src.cache import FrameBlock, FrameBlockCache
+from tests.factories import make_block
+
+
+def assert_blocks_equal(actual: FrameBlock, expected: FrameBlock) -> None:
+    assert actual.image_id == expected.image_id
+    np.testing.assert_array_equal(actual.ids, expected.ids)
+    np.testing.assert_array_equal(actual.depths, expected.depths)
+    np.testing.assert_array_equal(actual.matrix, expected.matrix)
+    assert actual.matrix.shape == expected.matrix.shape
+    if expected.has_color is None:
+        assert actual.has_color is None
+    else:
+        np.testing.assert_array_equal(actual.has_color, expected.has_color)
+    assert actual.colormap_names == expected.colormap_names
+    assert actual.created_at == expected.created_at
+    assert actual.colormap_applied_at == expected.colormap_applied_at
+
+
+@pytest.mark.parametrize("rgb", [False, True])
+def test_to_bytes_round_trip(rgb):
+    block = make_block(rgb=rgb)
+    assert_blocks_equal(FrameBlock.from_bytes(block.to_bytes()), block)
+
+
+def test_empty_block_round_trip():
+    block = make_block(count=0)
+    restored = FrameBlock.from_bytes(block.to_bytes())
+
+    assert len(restored) == 0
+    assert restored.matrix.shape == (0, 5)
+
+
+def test_round_trip_of_head_slice():
+    block = make_block(count=6, rgb=True).head(3)
+    assert_blocks_equal(FrameBlock.from_bytes(block.to_bytes()), block)
+
+
+def test_block_cache_invalidation_drops_blocks_and_rejects_stale_sets():
+    cache = FrameBlockCache(max_bytes=1024 * 1024)
+    generation = cache.generation(1)
+    cache.set(1, "key", make_block(), generation)
+    assert cache.get(1, "key") is not None
+
+    cache.invalidate_image(1)
+
+    assert cache.get(1, "key") is None
+    # A read that started before the invalidation must not repopulate the cache.
+    cache.set(1, "key", make_block(), generation)
+    assert cache.get(1, "key") is None
+    cache.set(1, "key", make_block(), cache.generation(1))
+    assert cache.get(1, "key") is not None
+
+
+def test_block_cache_evicts_to_stay_under_max_bytes():
+    block = make_block()
+    cache = FrameBlockCache(max_bytes=block.nbytes * 2)
+    for key in ("a", "b", "c"):
+        cache.set(1, key, make_block(), 0)
+
+    assert cache.get(1, "a") is None
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= cache.max_bytes
@@ -0,0 +1,52 @@
+import asyncio
+import fakeredis
+import pytest
+import src.services.frame_service as frame_service_module
+from src.cache import FrameCountCache, RedisBackend, SharedCache
+from src.models import Image
+from src.services import FrameService
+
+
+class CountingFrameRepository:
+
+    def __init__(self, total: int):
+        self.total = total
+        self.calls = 0
+
+    async def count_frames_in_range(self, image_id, depth_min, depth_max, level):
+        self.calls += 1
+        return self.total
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+def worker(redis, monkeypatch):
+    monkeypatch.setattr(frame_service_module, "shared_cache", SharedCache(RedisBackend(redis), image_ttl=60, frames_ttl=60))
+    monkeypatch.setattr(frame_service_module, "frame_count_cache", FrameCountCache(max_entries=100))
+    repository = CountingFrameRepository(total=10)
+    return FrameService(frame_repository=repository, image_repository=None), repository
+
+
+def test_range_total_is_cached(worker):
+    service, repository = worker
+    image = Image(id=1, total_frames=100)
+
+    assert asyncio.run(service.count_frames(image, 9000.0, 9001.0)) == 10
+    assert asyncio.run(service.count_frames(image, 9000.0, 9001.0)) == 10
+    assert repository.calls == 1
+
+
+def test_write_on_another_worker_retires_cached_total(worker, redis):
+    service, repository = worker
+    image = Image(id=1, total_frames=100)
+    assert asyncio.run(service.count_frames(image, 9000.0, 9001.0)) == 10
+
+    # Another worker appends frames and bumps the shared version; this worker's local cache is untouched.
+    repository.total = 15
+    SharedCache(RedisBackend(redis), image_ttl=60, frames_ttl=60).bump_version(1)
+
+    assert asyncio.run(service.count_frames(image, 9000.0, 9001.0)) == 15
@@ -0,0 +1,44 @@
+import pytest
+from src.database import Base, SessionLocal, engine
+from src.models import ImageFrame
+from src.repositories import ImageFrameRepository, ImageRepository
+
+
+@pytest.fixture
+def db():
+    Base.metadata.create_all(bind=engine)
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def make_image(db, frames: int = 3) -> int:
+    image = ImageRepository(db).create_image(target_width=2)
+    frame_repository = ImageFrameRepository(db)
+    for i in range(frames):
+        frame_repository.create_frame(image.id, 9000.0 + i * 0.1, [i, i])
+    return image.id
+
+
+def test_delete_removes_image_and_frames(db):
+    image_id = make_image(db)
+
+    assert ImageRepository(db).delete(image_id) is True
+
+    assert ImageRepository(db).get_by_id(image_id) is None
+    assert db.query(ImageFrame).filter(ImageFrame.image_id == image_id).count() == 0
+
+
+def test_delete_drops_the_image_partition(db, monkeypatch):
+    image_id = make_image(db, frames=0)
+    dropped = []
+    monkeypatch.setattr(ImageFrameRepository, "drop_partition", lambda self, image_id: dropped.append(image_id) or True)
+
+    assert ImageRepository(db).delete(image_id) is True
+
+    assert dropped == [image_id]
+    assert ImageRepository(db).get_by_id(image_id) is None
+
+
+def test_delete_missing_image(db):
+    assert ImageRepository(db).delete(10 ** 9) is False
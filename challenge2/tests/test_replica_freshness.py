@@ -0,0 +1,37 @@
+import asyncio
+from src.cache import FrameBlockCache, InMemoryBackend, ReplicaFreshness, SharedCache
+
+
+def make_freshness(max_lag=60.0, enabled=True):
+    shared_cache = SharedCache(InMemoryBackend(), image_ttl=60, frames_ttl=60)
+    block_cache = FrameBlockCache(max_bytes=1024 * 1024)
+    return ReplicaFreshness(shared_cache, block_cache, max_lag=max_lag, enabled=enabled), shared_cache, block_cache
+
+
+def test_disabled_never_routes_to_primary():
+    freshness, _, _ = make_freshness(enabled=False)
+
+    assert asyncio.run(freshness.recently_written(1)) is False
+
+
+def test_unseen_image_is_recent_until_lag_passes():
+    freshness, _, _ = make_freshness(max_lag=60.0)
+    assert asyncio.run(freshness.recently_written(1)) is True
+    assert asyncio.run(freshness.recently_written(1)) is True
+
+    expired, _, _ = make_freshness(max_lag=0.0)
+    asyncio.run(expired.recently_written(1))
+    assert asyncio.run(expired.recently_written(1)) is False
+
+
+def test_version_or_generation_bump_is_recent_again():
+    freshness, shared_cache, block_cache = make_freshness(max_lag=0.0)
+    asyncio.run(freshness.recently_written(1))
+    assert asyncio.run(freshness.recently_written(1)) is False
+
+    shared_cache.bump_version(1)
+    assert asyncio.run(freshness.recently_written(1)) is True
+    assert asyncio.run(freshness.recently_written(1)) is False
+
+    block_cache.invalidate_image(1)
+    assert asyncio.run(freshness.recently_written(1)) is True
@@ -0,0 +1,57 @@
+import fakeredis
+import numpy as np
+import pytest
+from src.cache import InMemoryBackend, RedisBackend, SharedCache
+from tests.factories import make_block
+
+
+@pytest.fixture(params=["memory", "redis"])
+def cache(request):
+    backend = InMemoryBackend() if request.param == "memory" else RedisBackend(fakeredis.FakeRedis())
+    return SharedCache(backend, image_ttl=60, frames_ttl=60)
+
+
+def test_version_starts_at_zero_and_bumps(cache):
+    assert cache.version(1) == 0
+    cache.bump_version(1)
+    assert cache.version(1) == 1
+    assert cache.version(2) == 0
+
+
+def test_bumped_version_hides_cached_blocks(cache):
+    block = make_block()
+    version = cache.version(1)
+    cache.set_frame_block(1, version, ("key",), block)
+    assert cache.get_frame_block(1, version, ("key",)) is not None
+
+    cache.bump_version(1)
+
+    assert cache.get_frame_block(1, cache.version(1), ("key",)) is None
+
+
+def test_blocks_are_keyed_by_image_and_key(cache):
+    cache.set_frame_block(1, 0, ("a",), make_block())
+
+    assert cache.get_frame_block(1, 0, ("b",)) is None
+    assert cache.get_frame_block(2, 0, ("a",)) is None
+
+
+def test_shared_block_round_trips(cache):
+    block = make_block()
+    cache.set_frame_block(1, 0, ("key",), block)
+
+    cached = cache.get_frame_block(1, 0, ("key",))
+
+    np.testing.assert_array_equal(cached.matrix, block.matrix)
+    np.testing.assert_array_equal(cached.ids, block.ids)
+
+
+def test_unavailable_backend_bypasses_cache():
+    client = fakeredis.FakeRedis(server=fakeredis.FakeServer())
+    client.connection_pool.connection_kwargs["server"].connected = False
+    cache = SharedCache(RedisBackend(client), image_ttl=60, frames_ttl=60)
+
+    assert cache.version(1) is None
+    assert cache.get_frame_block(1, 0, ("key",)) is None
+    cache.set_frame_block(1, 0, ("key",), make_block())
+    cache.bump_version(1)